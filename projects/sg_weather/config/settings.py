@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     # API Settings
     REALTIME_API_BASE_URL: str = "https://api-open.data.gov.sg/v2/real-time/api"
     API_RATE_LIMIT: int = 30
+    API_REQUESTS_PER_MINUTE: Optional[int] = None  # None disables throttling
 
     # Database Settings
     DB_HOST: str = "localhost"
@@ -20,6 +21,9 @@ class Settings(BaseSettings):
     DB_NAME: str = "weather_db"
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "postgres"
+    DB_BATCH_SIZE: int = 2000  # Files upserted per transaction
+    DB_POOL_MIN_SIZE: int = 4
+    DB_POOL_MAX_SIZE: int = 8
 
     # Data Storage
     DATA_DIR: Path = PROJECT_DIR / "data"
@@ -2,6 +2,7 @@ from prefect import flow, task
 from prefect.task_runners import ConcurrentTaskRunner
 import asyncio
 from datetime import datetime, timedelta
+from functools import lru_cache
 import logging
 import mlflow
 
@@ -10,11 +11,33 @@ from projects.sg_weather.src.ingestion.downloader import (
 )
 from projects.sg_weather.src.ingestion.processor import process_and_load_raw_files
 from projects.sg_weather.src.processing.transform import transform_data
+import projects.sg_weather.utils.loop  # noqa: F401
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Parameters processed when the flow is run without an explicit list
+_DEFAULT_PARAMETERS: tuple[str, ...] = (
+    "temperature",
+    "rainfall",
+    "humidity",
+    "wind-speed",
+    "wind-direction",
+    "two-hour-forecast",
+    "twenty-four-hour-forecast",
+    "four-day-forecast",
+    "pm25",
+    "psi",
+    "uv-index",
+)
+
+
+@lru_cache(maxsize=128)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO date string, treating a trailing Z as Singapore time"""
+    return datetime.fromisoformat(value.replace("Z", "+08:00"))
+
 
 @task(name="Download Weather Data", retries=3, retry_delay_seconds=60)
 async def download_task(start_date, end_date, parameters):
@@ -64,25 +87,52 @@ def log_to_mlflow(download_stats, process_stats, transform_stats):
     with mlflow.start_run(
         run_name=f"etl_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     ):
-        # Log download metrics
-        mlflow.log_metric("downloaded_files", download_stats["new_files"])
-        mlflow.log_metric("skipped_files", download_stats["skipped"])
-
-        # Log processing metrics
-        mlflow.log_metric("processed_files", process_stats["processed"])
-        mlflow.log_metric("processing_skipped", process_stats["skipped"])
-        mlflow.log_metric("processing_failed", process_stats["failed"])
-
-        # Log transform metrics
-        for table, count in transform_stats.items():
-            mlflow.log_metric(f"transformed_{table}_count", count)
+        # Batch all metrics into a single request
+        metrics = {
+            # Download metrics
+            "downloaded_files": download_stats["new_files"],
+            "skipped_files": download_stats["skipped"],
+            # Processing metrics
+            "processed_files": process_stats["processed"],
+            "processing_skipped": process_stats["skipped"],
+            "processing_failed": process_stats["failed"],
+            # Transform metrics
+            **{
+                f"transformed_{table}_count": count
+                for table, count in transform_stats.items()
+            },
+        }
+        mlflow.log_metrics(metrics)
 
         # Log parameters
-        mlflow.log_param("etl_timestamp", datetime.now().isoformat())
+        mlflow.log_params({"etl_timestamp": datetime.now().isoformat()})
 
     return True
 
 
+async def _run_pipeline(start_date, end_date, parameters, parallel):
+    """Run the download, process and transform stages on one event loop"""
+    # Execute download task
+    download_stats = await download_task(start_date, end_date, parameters)
+
+    # Execute process task
+    process_stats = await process_task(start_date, end_date, parameters)
+
+    # Execute transform task
+    transform_stats = await transform_task(start_date, end_date, parallel)
+
+    # Log to MLflow (sync client, so keep it off the event loop)
+    await asyncio.to_thread(
+        log_to_mlflow, download_stats, process_stats, transform_stats
+    )
+
+    return {
+        "download": download_stats,
+        "process": process_stats,
+        "transform": transform_stats,
+    }
+
+
 @flow(name="Weather ETL Pipeline", task_runner=ConcurrentTaskRunner())
 def weather_etl_pipeline(start_date=None, end_date=None, parameters=None, parallel=2):
     """Main ETL flow for weather data pipeline"""
@@ -96,40 +146,14 @@ def weather_etl_pipeline(start_date=None, end_date=None, parameters=None, parall
         start_date = end_date - timedelta(days=7)  # Default to 1 week
 
     if not parameters:
-        parameters = [
-            "temperature",
-            "rainfall",
-            "humidity",
-            "wind-speed",
-            "wind-direction",
-            "two-hour-forecast",
-            "twenty-four-hour-forecast",
-            "four-day-forecast",
-            "pm25",
-            "psi",
-            "uv-index",
-        ]
+        parameters = _DEFAULT_PARAMETERS
 
     # Convert string dates to datetime if needed
     if isinstance(start_date, str):
-        start_date = datetime.fromisoformat(start_date.replace("Z", "+08:00"))
+        start_date = _parse_iso(start_date)
     if isinstance(end_date, str):
-        end_date = datetime.fromisoformat(end_date.replace("Z", "+08:00"))
+        end_date = _parse_iso(end_date)
     logger.info(f"Running pipeline from {start_date} and {end_date}")
-    # Execute download task
-    download_stats = asyncio.run(download_task(start_date, end_date, parameters))
-
-    # Execute process task
-    process_stats = asyncio.run(process_task(start_date, end_date, parameters))
 
-    # Execute transform task
-    transform_stats = asyncio.run(transform_task(start_date, end_date, parallel))
-
-    # Log to MLflow
-    log_to_mlflow(download_stats, process_stats, transform_stats)
-
-    return {
-        "download": download_stats,
-        "process": process_stats,
-        "transform": transform_stats,
-    }
+    # Drive every stage from a single event loop
+    return asyncio.run(_run_pipeline(start_date, end_date, parameters, parallel))
@@ -1,17 +1,15 @@
 #!/usr/bin/env python3
 import asyncio
 import logging
-from projects.sg_weather.config.settings import get_settings
-from projects.sg_weather.src.ingestion.storage import WeatherStorage
+from projects.sg_weather.src.ingestion.storage import close_storage, get_storage
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 
 async def clear_weather_tables():
     """Clear all weather-related tables."""
-    storage = WeatherStorage(settings.database_url)
+    storage = get_storage()
 
     try:
         await storage.connect()
@@ -20,9 +18,15 @@ async def clear_weather_tables():
     except Exception as e:
         logger.error(f"Error clearing tables: {e}")
         raise
-    finally:
-        await storage.disconnect()
 
 
 if __name__ == "__main__":
-    asyncio.run(clear_weather_tables())
+    import projects.sg_weather.utils.loop  # noqa: F401
+
+    async def main():
+        try:
+            await clear_weather_tables()
+        finally:
+            await close_storage()
+
+    asyncio.run(main())
@@ -1,12 +1,12 @@
 import asyncio
-import json
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import List, Dict, Tuple, Callable, Any
-from tqdm import tqdm
+from tqdm.asyncio import tqdm as tqdm_asyncio
+import aiofiles
 
 from projects.sg_weather.config.settings import get_settings
 from projects.sg_weather.src.ingestion.client import WeatherAPIClient
+from projects.sg_weather.src.ingestion.downloader import DownloadMetadata
 
 
 settings = get_settings()
@@ -15,61 +15,6 @@ DATA_DIR = settings.DATA_DIR
 RAW_DATA_DIR = settings.RAW_DATA_DIR
 
 
-class DownloadMetadata:
-    """Manages download state metadata efficiently in O(1) lookup time"""
-
-    def __init__(self, metadata_file: Path = DATA_DIR / "download_metadata.json"):
-        self.metadata_file = metadata_file
-        self.data: Dict[str, Dict[str, str]] = self._load_metadata()
-
-    def _load_metadata(self) -> Dict[str, Dict[str, str]]:
-        """Load metadata from file or create new."""
-        # Define all expected fields
-        expected_fields = {
-            "temperature": {},
-            "rainfall": {},
-            "humidity": {},
-            "wind-speed": {},
-            "wind-direction": {},
-            "two-hour-forecast": {},
-            "twenty-four-hour-forecast": {},
-            "four-day-forecast": {},
-            "wbgt": {},
-            "lightning": {},
-            "pm25": {},
-            "psi": {},
-            "uv-index": {},
-        }
-
-        if self.metadata_file.exists():
-            with open(self.metadata_file) as f:
-                existing_metadata = json.load(f)
-
-                # Check for and add any missing fields
-                for field in expected_fields:
-                    if field not in existing_metadata:
-                        existing_metadata[field] = {}
-
-                return existing_metadata
-
-        return expected_fields
-
-    def save(self) -> None:
-        """Save metadata to file."""
-        with open(self.metadata_file, "w") as f:
-            json.dump(self.data, f)
-
-    def is_downloaded(self, param: str, date: datetime) -> bool:
-        """Check if a specific date-parameter combination exists."""
-        date_str = date.strftime("%Y%m%d")
-        return date_str in self.data[param]
-
-    def mark_downloaded(self, param: str, date: datetime) -> None:
-        """Mark a date-parameter combination as downloaded."""
-        date_str = date.strftime("%Y%m%d")
-        self.data[param][date_str] = datetime.now().isoformat()
-
-
 async def download_date_range(
     start_date: datetime,
     end_date: datetime,
@@ -82,6 +27,9 @@ async def download_date_range(
     new_files = 0
     skipped_files = 0
 
+    # Bound in-flight requests across every (day, parameter) pair
+    sem = asyncio.Semaphore(settings.API_RATE_LIMIT)
+
     # Define method mapping with additional endpoints
     METHOD_MAP = {
         "temperature": lambda client: client.get_temperature,
@@ -99,66 +47,86 @@ async def download_date_range(
         "uv-index": lambda client: client.get_uv_index,
     }
 
-    async def save_response(client: WeatherAPIClient, date: datetime, param: str):
+    # Client methods resolved once per client, keyed by parameter
+    bound_methods: Dict[str, Callable[[datetime], Any]] = {}
+
+    async def save_response(date: datetime, date_str: str, param: str):
         nonlocal new_files, skipped_files
 
         # Quick metadata check unless forcing download
-        if not force_download and metadata.is_downloaded(param, date):
+        if not force_download and metadata.is_downloaded(param, date_str):
             skipped_files += 1
             return
 
-        if param not in METHOD_MAP:
+        if param not in bound_methods:
             print(f"Warning: Unknown parameter {param}")
             return
 
-        try:
-            method = METHOD_MAP[param](client)
-            response = await method(date)
-
-            # Print raw response before saving
-            # print(f"\nRaw response for {param} on {date}:")
-            # print(json.dumps(response.model_dump(), indent=2)[:500])
-
-            # Create parameter-specific directory
-            param_dir = RAW_DATA_DIR / param
-            param_dir.mkdir(exist_ok=True)
-
-            # Save to file
-            filename = param_dir / f"{date.strftime('%Y%m%d')}_{param}.json"
-            with open(filename, "w") as f:
-                json.dump(
-                    response.model_dump(by_alias=True, mode="json"), f, default=str
-                )
-
-            # Update metadata
-            metadata.mark_downloaded(param, date)
-            new_files += 1
-
-        except Exception as e:
-            print(f"\nError saving {param} data for {date}:")
-            print(f"Error type: {type(e)}")
-            print(f"Error message: {str(e)}")
-            if hasattr(e, "__dict__"):
-                print(f"Error details: {e.__dict__}")
-
-    async with WeatherAPIClient() as client:
-        total_days = (end_date - start_date).days + 1
-        date_range = [start_date + timedelta(days=x) for x in range(total_days)]
-
-        # Validate parameters
-        valid_params = [p for p in parameters if p in METHOD_MAP]
-        if len(valid_params) != len(parameters):
-            invalid_params = set(parameters) - set(valid_params)
-            print(f"Warning: Skipping invalid parameters: {invalid_params}")
-
-        for current_date in tqdm(date_range, desc="Downloading data"):
+        async with sem:
+            try:
+                response = await bound_methods[param](date)
+
+                # Print raw response before saving
+                # print(f"\nRaw response for {param} on {date}:")
+                # print(json.dumps(response.model_dump(), indent=2)[:500])
+
+                # Create parameter-specific directory
+                param_dir = RAW_DATA_DIR / param
+                param_dir.mkdir(exist_ok=True)
+
+                # Save to file
+                filename = param_dir / f"{date_str}_{param}.json"
+                # Serialize straight to JSON in pydantic-core, skipping the dict,
+                # and write it off the event loop
+                async with aiofiles.open(filename, "wb") as f:
+                    await f.write(response.model_dump_json(by_alias=True).encode())
+
+                # Update metadata
+                metadata.mark_downloaded(param, date_str)
+                new_files += 1
+                if metadata.needs_flush:
+                    await metadata.flush()
+
+            except Exception as e:
+                print(f"\nError saving {param} data for {date}:")
+                print(f"Error type: {type(e)}")
+                print(f"Error message: {str(e)}")
+                if hasattr(e, "__dict__"):
+                    print(f"Error details: {e.__dict__}")
+
+    try:
+        await metadata.connect()
+
+        # Size the connection pool to the concurrency bound so every in-flight
+        # request can reuse a kept-alive connection
+        async with WeatherAPIClient(
+            max_connections=settings.API_RATE_LIMIT * 2,
+            requests_per_minute=settings.API_REQUESTS_PER_MINUTE,
+        ) as client:
+            total_days = (end_date - start_date).days + 1
+            date_range = [start_date + timedelta(days=x) for x in range(total_days)]
+
+            # Validate parameters
+            valid_params = [p for p in parameters if p in METHOD_MAP]
+            if len(valid_params) != len(parameters):
+                invalid_params = set(parameters) - set(valid_params)
+                print(f"Warning: Skipping invalid parameters: {invalid_params}")
+
+            bound_methods.update({p: METHOD_MAP[p](client) for p in valid_params})
+
+            # Schedule every (day, parameter) pair at once so a slow request on
+            # one day doesn't hold up the next; the semaphore bounds concurrency
             tasks = []
-            for param in valid_params:
-                tasks.append(save_response(client, current_date, param))
+            for current_date in date_range:
+                # Format once per day and share across all parameters
+                date_str = current_date.strftime("%Y%m%d")
+                for param in valid_params:
+                    tasks.append(save_response(current_date, date_str, param))
 
-            await asyncio.gather(*tasks)
-            metadata.save()  # Save after each day
-            # await asyncio.sleep(1)  # Rate limiting
+            await tqdm_asyncio.gather(*tasks, desc="Downloading data")
+    finally:
+        # Flushes anything left over and closes the database, even if setup failed
+        await metadata.close()
 
     return new_files, skipped_files
 
@@ -195,4 +163,6 @@ async def test_download():
 
 
 if __name__ == "__main__":
+    import projects.sg_weather.utils.loop  # noqa: F401
+
     asyncio.run(test_download())
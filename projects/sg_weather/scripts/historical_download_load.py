@@ -7,7 +7,7 @@ from typing import List, Tuple
 
 from projects.sg_weather.config.settings import get_settings
 from projects.sg_weather.src.ingestion.client import WeatherAPIClient
-from projects.sg_weather.src.ingestion.storage import WeatherStorage
+from projects.sg_weather.src.ingestion.storage import close_storage, get_storage
 from projects.sg_weather.scripts.download_historical import download_date_range
 from projects.sg_weather.scripts.load_to_database import load_historical_data
 
@@ -65,7 +65,7 @@ async def download_and_load_historical_data():
 
 async def verify_database_connection():
     """Verify database connection and create schema if needed."""
-    storage = WeatherStorage(settings.database_url)
+    storage = get_storage()
     try:
         await storage.connect()
         await storage.initialize_tables()
@@ -73,17 +73,19 @@ async def verify_database_connection():
     except Exception as e:
         logger.error(f"Database connection error: {e}")
         raise
-    finally:
-        await storage.disconnect()
 
 
 if __name__ == "__main__":
+    import projects.sg_weather.utils.loop  # noqa: F401
 
     async def main():
-        # First verify database connection
-        await verify_database_connection()
-
-        # Then download and load data
-        await download_and_load_historical_data()
+        try:
+            # First verify database connection
+            await verify_database_connection()
+
+            # Then download and load data
+            await download_and_load_historical_data()
+        finally:
+            await close_storage()
 
     asyncio.run(main())
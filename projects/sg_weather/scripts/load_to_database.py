@@ -1,112 +1,97 @@
 import asyncio
-import json
+import os
+from itertools import chain
 from pathlib import Path
 from tqdm import tqdm
 from datetime import datetime
 import logging
+from typing import Iterator, List, Tuple
 
 from projects.sg_weather.config.settings import get_settings
-from projects.sg_weather.src.ingestion.storage import WeatherStorage
-from projects.sg_weather.src.schemas.weather import (
-    UVIndexData,
-    WeatherReadingData,
-    PM25Data,
-    PSIData,
-    TwoHourForecastData,
-    TwentyFourHourOutlookData,
-    FourDayOutlookData,
-    # UVIndexResponse,
-    # WeatherResponse,
-    # PM25Response,
-    # PSIResponse,
-    # TwoHourForecastResponse,
-    # TwentyFourHourOutlookResponse,
-    # FourDayOutlookResponse,
-)
+from projects.sg_weather.src.ingestion.processor import PARAM_TO_MODEL, load_raw_file
+from projects.sg_weather.src.ingestion.storage import close_storage, get_storage
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+def _iter_json_chunks(directory: Path, size: int) -> Iterator[List[Path]]:
+    """Yield JSON files in a directory in chunks of at most size."""
+    chunk: List[Path] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                chunk.append(Path(entry.path))
+                if len(chunk) == size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _ingest_param(
+    param_dir: Path, sem: asyncio.Semaphore
+) -> List[Tuple[str, str, None, Path, str, str]]:
+    """Read and validate every raw file in a parameter directory."""
+    parameter = param_dir.name
+    if parameter not in PARAM_TO_MODEL:
+        logger.warning(f"Unsupported parameter: {parameter}, skipping")
+        return []
+
+    print(f"\nProcessing {parameter}...")
+
+    files_to_process = []
+    for chunk in _iter_json_chunks(param_dir, 10):
+        # Read and validate the chunk concurrently in worker threads
+        async with sem:
+            results = await asyncio.gather(
+                *[asyncio.to_thread(load_raw_file, file, parameter) for file in chunk]
+            )
+        files_to_process.extend(r for r in results if r is not None)
+
+    return files_to_process
+
+
 async def load_historical_data() -> None:
-    storage = WeatherStorage(settings.database_url, batch_size=300)
+    storage = get_storage()
     await storage.connect()
     await storage.initialize_tables()
 
-    try:
-        files_to_process = []
-
-        for param_dir in settings.RAW_DATA_DIR.glob("*"):
-            if not param_dir.is_dir():
-                continue
-
-            parameter = param_dir.name
-            print(f"\nProcessing {parameter}...")
-
-            json_files = list(param_dir.glob("*.json"))
-            for i in range(0, len(json_files), 10):
-                chunk = json_files[i : i + 10]
-
-                for file in chunk:
-                    try:
-                        with open(file) as f:
-                            data = json.load(f)
-
-                            # Use appropriate Pydantic model based on parameter
-                            if parameter in [
-                                "temperature",
-                                "rainfall",
-                                "humidity",
-                                "wind-direction",
-                                "wind-speed",
-                            ]:
-                                model_data = WeatherReadingData(**data)
-                                data_type = "reading"
-                            elif parameter == "uv-index":
-                                model_data = UVIndexData(**data)
-                                data_type = "reading"
-                            elif parameter == "pm25":
-                                model_data = PM25Data(**data)
-                                data_type = "reading"
-                            elif parameter == "psi":
-                                model_data = PSIData(**data)
-                                data_type = "reading"
-                            elif parameter == "two-hour-forecast":
-                                model_data = TwoHourForecastData(**data)
-                                data_type = "forecast"
-                            elif parameter == "twenty-four-hour-forecast":
-                                model_data = TwentyFourHourOutlookData(**data)
-                                data_type = "forecast"
-                            elif parameter == "four-day-forecast":
-                                model_data = FourDayOutlookData(**data)
-                                data_type = "forecast"
-
-                            # await storage.store_data(data_type, parameter, model_data, file)
-                            files_to_process.append(
-                                (data_type, parameter, model_data, file)
-                            )
-
-                    except Exception as e:
-                        print(f"Error loading {file}: {e}")
-
-        # Process all files in batches
-        result = await storage.store_data_batch(files_to_process)
-
-        # Log results
-        logger.info("\nBatch Processing Results:")
-        logger.info(f" ✓ Successfully processed: {len(result.processed)} files")
-        logger.info(f" ✓ Skipped (unchanged): {len(result.skipped)} files")
-        logger.info(f" ✓ Failed: {len(result.failed)} files")
-
-        if result.failed:
-            logger.info("\n ✕ Failed files:")
-            for file_path, error in result.failed:
-                logger.info(f"- {file_path}: {error}")
-
-    finally:
-        await storage.disconnect()
+    # Parse every parameter directory concurrently; the semaphore keeps
+    # the number of chunks in flight in line with the available cores
+    sem = asyncio.Semaphore(os.cpu_count() or 1)
+    results = await asyncio.gather(
+        *[
+            _ingest_param(param_dir, sem)
+            for param_dir in settings.RAW_DATA_DIR.iterdir()
+            if param_dir.is_dir()
+        ]
+    )
+    files_to_process = list(chain.from_iterable(results))
+
+    # Process all files in batches
+    result = await storage.store_data_batch(files_to_process, batch_size=5000)
+
+    # Log results
+    logger.info("\nBatch Processing Results:")
+    logger.info(f" ✓ Successfully processed: {len(result.processed)} files")
+    logger.info(f" ✓ Skipped (unchanged): {len(result.skipped)} files")
+    logger.info(f" ✓ Failed: {len(result.failed)} files")
+
+    if result.failed:
+        logger.info("\n ✕ Failed files:")
+        for file_path, error in result.failed:
+            logger.info(f"- {file_path}: {error}")
 
 
 if __name__ == "__main__":
-    asyncio.run(load_historical_data())
+    import projects.sg_weather.utils.loop  # noqa: F401
+
+    async def main():
+        try:
+            await load_historical_data()
+        finally:
+            await close_storage()
+
+    asyncio.run(main())
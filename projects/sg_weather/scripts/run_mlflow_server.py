@@ -4,14 +4,18 @@ Simple script to ensure MLflow server is running.
 Run this before running any flows that log to MLflow.
 """
 
+import asyncio
 import subprocess
-import time
 import sys
 import os
 from pathlib import Path
 
+from projects.sg_weather.utils.net import wait_port
 
-def start_mlflow_server():
+MLFLOW_PORT = 5000
+
+
+async def start_mlflow_server():
     print("Starting MLflow server...")
 
     # Create mlflow directory if it doesn't exist
@@ -20,13 +24,18 @@ def start_mlflow_server():
 
     try:
         # Check if server is already running
-        result = subprocess.run(
-            ["pgrep", "-f", "mlflow server"], capture_output=True, text=True
+        pgrep = await asyncio.create_subprocess_exec(
+            "pgrep",
+            "-f",
+            "mlflow server",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
+        stdout, _ = await pgrep.communicate()
 
-        if result.stdout.strip():
+        if stdout.strip():
             print("MLflow server is already running!")
-            print("To access the UI, visit: http://localhost:5000")
+            print(f"To access the UI, visit: http://localhost:{MLFLOW_PORT}")
             return True
 
         # Start the server with sqlite backend
@@ -44,21 +53,23 @@ def start_mlflow_server():
             "--host",
             "0.0.0.0",
             "--port",
-            "5000",
+            str(MLFLOW_PORT),
         ]
 
+        # Popen rather than an asyncio subprocess so the server outlives this
+        # script's event loop
         process = subprocess.Popen(
             cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
         )
 
-        # Wait for server to start
-        time.sleep(5)
-
-        # Check if server started successfully
-        if process.poll() is None:  # Process is still running
+        # Wait until the server answers instead of sleeping a fixed time
+        if await wait_port("127.0.0.1", MLFLOW_PORT, process):
             print("MLflow server started successfully!")
-            print("To access the UI, visit: http://localhost:5000")
+            print(f"To access the UI, visit: http://localhost:{MLFLOW_PORT}")
             return True
+        elif process.poll() is None:  # Still running but not responding yet
+            print("MLflow server did not respond before the timeout")
+            return False
         else:
             stdout, stderr = process.communicate()
             print(f"Failed to start MLflow server: {stderr}")
@@ -70,5 +81,5 @@ def start_mlflow_server():
 
 
 if __name__ == "__main__":
-    success = start_mlflow_server()
+    success = asyncio.run(start_mlflow_server())
     sys.exit(0 if success else 1)
@@ -4,27 +4,38 @@ Script to start or stop the Prefect server.
 Usage: python run_prefect_server.py [start|stop]
 """
 
+import asyncio
 import subprocess
 import time
 import sys
 import signal
 import os
 
+from projects.sg_weather.utils.net import wait_port
 
-def start_prefect_server():
+PREFECT_PORT = 4200
+
+
+async def start_prefect_server():
     print("Starting Prefect server...")
     try:
         # Check if server is already running
-        result = subprocess.run(
-            ["prefect", "server", "status"], capture_output=True, text=True
+        status = await asyncio.create_subprocess_exec(
+            "prefect",
+            "server",
+            "status",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
+        stdout, _ = await status.communicate()
 
-        if "is running" in result.stdout:
+        if "is running" in stdout.decode():
             print("Prefect server is already running!")
             print("To access the UI, visit: http://localhost:4200")
             return True
 
-        # Start the server
+        # Start the server with Popen rather than an asyncio subprocess so it
+        # outlives this script's event loop
         process = subprocess.Popen(
             ["prefect", "server", "start"],
             stdout=subprocess.PIPE,
@@ -32,14 +43,14 @@ def start_prefect_server():
             text=True,
         )
 
-        # Wait for server to start
-        time.sleep(5)
-
-        # Check if server started successfully
-        if process.poll() is None:  # Process is still running
+        # Wait until the server answers instead of sleeping a fixed time
+        if await wait_port("127.0.0.1", PREFECT_PORT, process):
             print("Prefect server started successfully!")
             print("To access the UI, visit: http://localhost:4200")
             return True
+        elif process.poll() is None:  # Still running but not responding yet
+            print("Prefect server did not respond before the timeout")
+            return False
         else:
             stdout, stderr = process.communicate()
             print(f"Failed to start Prefect server: {stderr}")
@@ -99,7 +110,7 @@ if __name__ == "__main__":
         action = sys.argv[1].lower()
 
     if action == "start":
-        success = start_prefect_server()
+        success = asyncio.run(start_prefect_server())
     elif action == "stop":
         success = stop_prefect_server()
     else:
@@ -48,4 +48,6 @@ async def test_connection():
 
 
 if __name__ == "__main__":
+    import projects.sg_weather.utils.loop  # noqa: F401
+
     asyncio.run(test_connection())
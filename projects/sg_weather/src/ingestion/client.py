@@ -1,8 +1,12 @@
+import asyncio
 from datetime import datetime
-from typing import Optional, Any, List
+from itertools import chain
+from typing import Optional, Any, List, Dict, Tuple, Type, Union
 import aiohttp
 import json
+import orjson
 from aiohttp import ClientSession
+from pydantic import BaseModel
 from logging import getLogger
 from projects.sg_weather.src.schemas.weather import (
     WeatherReadingData,
@@ -28,12 +32,65 @@ from projects.sg_weather.src.schemas.weather import (
 logger = getLogger(__name__)
 
 
+class RequestCredits:
+    """Lets at most `credits` requests start within any `refund_time` window."""
+
+    def __init__(self, credits: int, refund_time: float = 60.0):
+        self.refund_time = refund_time
+        self._sem = asyncio.Semaphore(credits)
+
+    async def acquire(self) -> None:
+        """Spend one credit, waiting for a refund if none are left."""
+        await self._sem.acquire()
+        asyncio.get_running_loop().call_later(self.refund_time, self._sem.release)
+
+
 class WeatherAPIClient:
     """Client for the Singapore Weather Data API."""
 
-    def __init__(self, base_url: str = "https://api-open.data.gov.sg/v2/real-time/api"):
+    # Parameter name -> (endpoint, response model, extra query params)
+    ENDPOINTS: Dict[str, Tuple[str, Type[BaseModel], Dict[str, str]]] = {
+        "temperature": ("/air-temperature", WeatherReadingData, {}),
+        "rainfall": ("/rainfall", WeatherReadingData, {}),
+        "humidity": ("/relative-humidity", WeatherReadingData, {}),
+        "wind-speed": ("/wind-speed", WeatherReadingData, {}),
+        "wind-direction": ("/wind-direction", WeatherReadingData, {}),
+        "two-hour-forecast": ("/two-hr-forecast", TwoHourForecastData, {}),
+        "twenty-four-hour-forecast": (
+            "/twenty-four-hr-forecast",
+            TwentyFourHourOutlookData,
+            {},
+        ),
+        "four-day-forecast": ("/four-day-outlook", FourDayOutlookData, {}),
+        "wbgt": ("/weather", WBGTData, {"api": "wbgt"}),
+        "lightning": ("/weather", LightningData, {"api": "lightning"}),
+        "pm25": ("/pm25", PM25Data, {}),
+        "psi": ("/psi", PSIData, {}),
+        "uv-index": ("/uv", UVIndexData, {}),
+    }
+
+    def __init__(
+        self,
+        base_url: str = "https://api-open.data.gov.sg/v2/real-time/api",
+        max_connections: int = 64,
+        max_connections_per_host: int = 32,
+        max_concurrent_requests: int = 20,
+        request_timeout: float = 60.0,
+        requests_per_minute: Optional[int] = None,
+    ):
         self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.request_timeout = request_timeout
         self._session: Optional[ClientSession] = None
+        # Caps requests in flight across every caller sharing this client
+        self._sem = asyncio.Semaphore(max_concurrent_requests)
+        # Keeps the request rate under the API quota instead of tripping it
+        self._credits = (
+            RequestCredits(requests_per_minute, refund_time=60.0)
+            if requests_per_minute
+            else None
+        )
 
     async def __aenter__(self) -> "WeatherAPIClient":
         await self.connect()
@@ -45,7 +102,22 @@ class WeatherAPIClient:
     async def connect(self):
         """Initialize the aiohttp session."""
         if self._session is None:
-            self._session = aiohttp.ClientSession()
+            # Keep connections alive so requests reuse a pool of TLS connections,
+            # and cache DNS lookups for the lifetime of the run. aiohttp already
+            # sends Accept-Encoding for gzip/deflate, plus br once Brotli is
+            # installed (via the speedups extra), and decodes responses itself
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                raise_for_status=True,
+            )
 
     async def disconnect(self):
         """Close the aiohttp session."""
@@ -63,21 +135,19 @@ class WeatherAPIClient:
             )
 
         url = f"{self.base_url}{endpoint}"
-        try:
-            async with self._session.get(url, params=params) as response:
-                response.raise_for_status()
-                raw_data = await response.json()
-                # Debug print
-                # print(raw_data["code"], type(raw_data["code"]))
-                # print(raw_data["errorMsg"], type(raw_data["errorMsg"]))
-                # print(raw_data["data"], type(raw_data["data"]))
-                # print(f"\nRaw API Response for {endpoint}:")
-                # print(json.dumps(raw_data, indent=2) + "...")
-
-                return raw_data
-        except aiohttp.ClientError as e:
-            logger.error(f"Error making request to {url}: {e}")
-            raise
+        if self._credits is not None:
+            await self._credits.acquire()
+        # Non-2xx responses raise ClientResponseError from the session itself
+        async with self._sem, self._session.get(url, params=params) as response:
+            raw_data = orjson.loads(await response.read())
+            # Debug print
+            # print(raw_data["code"], type(raw_data["code"]))
+            # print(raw_data["errorMsg"], type(raw_data["errorMsg"]))
+            # print(raw_data["data"], type(raw_data["data"]))
+            # print(f"\nRaw API Response for {endpoint}:")
+            # print(json.dumps(raw_data, indent=2) + "...")
+
+            return raw_data
 
     async def fetch_paginated_api_results(
         self, endpoint: str, params: Optional[dict[str, Any]] = None
@@ -85,6 +155,7 @@ class WeatherAPIClient:
         """
         Make paginated requests to the API until all data is retrieved.
         Preserves all data fields while aggregating paginated items/records/readings.
+        The returned dict is built from the decoded responses and owned by the caller.
         """
         if self._session is None:
             raise RuntimeError(
@@ -94,14 +165,14 @@ class WeatherAPIClient:
         params = params or {}
         page_count = 0
         total_items = 0
-        seen_tokens = set()  # Track unique tokens
-        token_sequence = []  # Preserve token order
+        seen_tokens: Dict[str, int] = {}  # Token -> page it was returned on, in order
 
         # Make initial request to get structure and first page
         first_response = await self._make_request(endpoint, params)
 
-        # Initialize with first response data
-        aggregated_data = first_response["data"].copy()
+        # Initialize with first response data; the response was freshly decoded
+        # for this call, so it is aggregated in place rather than copied
+        aggregated_data = first_response["data"]
 
         # Track which key contains paginated items
         paginated_key = None
@@ -117,21 +188,29 @@ class WeatherAPIClient:
             # No pagination detected, return as is
             return first_response
 
-        # Initialize list of paginated items
-        all_items = aggregated_data[paginated_key]
+        # Collect each page's items and flatten them once at the end
+        first_items = aggregated_data[paginated_key]
+        pages = [first_items]
         page_count += 1
-        total_items += len(all_items)
+        total_items += len(first_items)
         logger.info(
-            f"Retrieved page {page_count} for {endpoint}: {len(all_items)} {paginated_key}"
+            "Retrieved page %d for %s: %d %s",
+            page_count,
+            endpoint,
+            len(first_items),
+            paginated_key,
         )
 
         # Log first page info
         current_token = aggregated_data.get("paginationToken")
         if current_token:
-            seen_tokens.add(current_token)
-            token_sequence.append(current_token)
+            seen_tokens[current_token] = page_count
             logger.info(
-                f"Page {page_count} - New token: {current_token[:20]}... ({len(all_items)} {paginated_key}"
+                "Page %d - New token: %.20s... (%d %s",
+                page_count,
+                current_token,
+                len(first_items),
+                paginated_key,
             )
 
         # Continue fetching if there's a pagination token
@@ -160,23 +239,21 @@ class WeatherAPIClient:
                             f"Duplicate token detected: {next_token[:20]}..."
                         )
                         logger.warning("Token sequence:")
-                        for i, token in enumerate(token_sequence, 1):
-                            logger.warning(f"  Page {i}: {token[:20]}...")
+                        for token, page in seen_tokens.items():
+                            logger.warning(f"  Page {page}: {token[:20]}...")
                         logger.warning(f"Duplicate found at page {page_count + 1}")
                         break
-                    seen_tokens.add(next_token)
-                    token_sequence.append(next_token)
+                    seen_tokens[next_token] = page_count + 1
 
                 # Append paginated items
                 new_items = next_data[paginated_key]
-                all_items.extend(new_items)
+                pages.append(new_items)
 
-                # Update counters and log progress
+                # Update counters and log progress; %-style arguments are only
+                # formatted when INFO is enabled
                 page_count += 1
                 total_items += len(new_items)
-                logger.info(
-                    f"Page {page_count} - {next_token[:20] if next_token else 'No'}"
-                )
+                logger.info("Page %d - %.20s", page_count, next_token or "No")
 
                 # update token for next iteration
                 current_token = next_token
@@ -189,6 +266,7 @@ class WeatherAPIClient:
                 break
 
         # Update final data with all items
+        all_items = list(chain.from_iterable(pages))
         aggregated_data[paginated_key] = all_items
 
         # Remove pagination token from final resopnse
@@ -199,11 +277,6 @@ class WeatherAPIClient:
         logger.info(f"- Total pages: {page_count}")
         logger.info(f"- Total {paginated_key}: {total_items}")
         logger.info(f"- Unique tokens: {len(seen_tokens)}")
-        logger.info(f"- Token sequence length: {len(token_sequence)}")
-
-        if len(seen_tokens) != len(token_sequence):
-            logger.warning("Number of unique tokens doesn't match sequence length!")
-            logger.warning("This suggests some tokens were repeated")
 
         # Perform basic validation
         if page_count > 1:
@@ -217,94 +290,84 @@ class WeatherAPIClient:
 
         return aggregated_data
 
+    async def fetch(self, parameter: str, date: Optional[datetime] = None) -> BaseModel:
+        """Fetch all data for a parameter and validate it into its model."""
+        endpoint, model, extra_params = self.ENDPOINTS[parameter]
+        params = {"date": date.isoformat()} if date else {}
+        params.update(extra_params)
+        data = await self.fetch_paginated_api_results(endpoint, params or None)
+        return model.model_validate(data)
+
+    async def get_many(
+        self, date: Optional[datetime], parameters: List[str]
+    ) -> List[Union[BaseModel, BaseException]]:
+        """
+        Fetch several parameters for one date concurrently, in parameter order.
+        A failed fetch is returned as its exception instead of cancelling the rest.
+        """
+        tasks = [self.fetch(param, date) for param in parameters]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
     async def get_temperature(
         self, date: Optional[datetime] = None
     ) -> WeatherReadingData:
         """Get temperature readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/air-temperature", params)
-        return WeatherReadingData(**data)
+        return await self.fetch("temperature", date)
 
     async def get_rainfall(self, date: Optional[datetime] = None) -> WeatherReadingData:
         """Get rainfall readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/rainfall", params)
-        return WeatherReadingData(**data)
+        return await self.fetch("rainfall", date)
 
     async def get_humidity(self, date: Optional[datetime] = None) -> WeatherReadingData:
         """Get relative humidity readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/relative-humidity", params)
-        return WeatherReadingData(**data)
+        return await self.fetch("humidity", date)
 
     async def get_wind_speed(
         self, date: Optional[datetime] = None
     ) -> WeatherReadingData:
         """Get wind speed readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/wind-speed", params)
-        return WeatherReadingData(**data)
+        return await self.fetch("wind-speed", date)
 
     async def get_wind_direction(
         self, date: Optional[datetime] = None
     ) -> WeatherReadingData:
         """Get wind direction readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/wind-direction", params)
-        return WeatherReadingData(**data)
+        return await self.fetch("wind-direction", date)
 
     async def get_two_hour_forecast(
         self, date: Optional[datetime] = None
     ) -> TwoHourForecastData:
         """Get 2-hour weather forecast."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/two-hr-forecast", params)
-        return TwoHourForecastData(**data)
+        return await self.fetch("two-hour-forecast", date)
 
     async def get_24_hour_forecast(
         self, date: Optional[datetime] = None
     ) -> TwentyFourHourOutlookData:
         """Get 24-hour weather forecast."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results(
-            "/twenty-four-hr-forecast", params
-        )
-        return TwentyFourHourOutlookData(**data)
+        return await self.fetch("twenty-four-hour-forecast", date)
 
     async def get_four_day_forecast(
         self, date: Optional[datetime] = None
     ) -> FourDayOutlookData:
         """Get 4-day weather forecast."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/four-day-outlook", params)
-        return FourDayOutlookData(**data)
+        return await self.fetch("four-day-forecast", date)
 
     async def get_wbgt(self, date: Optional[datetime] = None) -> WBGTData:
         """Get WBGT (Wet Bulb Globe Temperature) readings."""
-        params = {"date": date.isoformat() if date else None, "api": "wbgt"}
-        data = await self.fetch_paginated_api_results("/weather", params)
-        return WBGTData(**data)
+        return await self.fetch("wbgt", date)
 
     async def get_lightning(self, date: Optional[datetime] = None) -> LightningData:
         """Get lightning observations."""
-        params = {"date": date.isoformat() if date else None, "api": "lightning"}
-        data = await self.fetch_paginated_api_results("/weather", params)
-        return LightningData(**data)
+        return await self.fetch("lightning", date)
 
     async def get_pm25(self, date: Optional[datetime] = None) -> PM25Data:
         """Get PM2.5 readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/pm25", params)
-        return PM25Data(**data)
+        return await self.fetch("pm25", date)
 
     async def get_psi(self, date: Optional[datetime] = None) -> PSIData:
         """Get PSI readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/psi", params)
-        return PSIData(**data)
+        return await self.fetch("psi", date)
 
     async def get_uv_index(self, date: Optional[datetime] = None) -> UVIndexData:
         """Get UV index readings."""
-        params = {"date": date.isoformat()} if date else None
-        data = await self.fetch_paginated_api_results("/uv", params)
-        return UVIndexData(**data)
+        return await self.fetch("uv-index", date)
@@ -1,9 +1,10 @@
 import asyncio
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Tuple, Callable, Any
+from typing import List, Set, Tuple, Any, Optional
 from tqdm import tqdm
+import aiosqlite
+import orjson
 
 from projects.sg_weather.config.settings import get_settings
 from projects.sg_weather.src.ingestion.client import WeatherAPIClient
@@ -16,58 +17,105 @@ RAW_DATA_DIR = settings.RAW_DATA_DIR
 
 
 class DownloadMetadata:
-    """Manages download state metadata efficiently in O(1) lookup time"""
+    """Manages download state metadata in a SQLite database keyed on (param, date)"""
 
-    def __init__(self, metadata_file: Path = DATA_DIR / "download_metadata.json"):
+    def __init__(
+        self,
+        metadata_file: Path = DATA_DIR / "download_metadata.db",
+        flush_threshold: int = 100,
+    ):
         self.metadata_file = metadata_file
-        self.data: Dict[str, Dict[str, str]] = self._load_metadata()
-
-    def _load_metadata(self) -> Dict[str, Dict[str, str]]:
-        """Load metadata from file or create new."""
-        # Define all expected fields
-        expected_fields = {
-            "temperature": {},
-            "rainfall": {},
-            "humidity": {},
-            "wind-speed": {},
-            "wind-direction": {},
-            "two-hour-forecast": {},
-            "twenty-four-hour-forecast": {},
-            "four-day-forecast": {},
-            "wbgt": {},
-            "lightning": {},
-            "pm25": {},
-            "psi": {},
-            "uv-index": {},
-        }
-
-        if self.metadata_file.exists():
-            with open(self.metadata_file) as f:
-                existing_metadata = json.load(f)
-
-                # Check for and add any missing fields
-                for field in expected_fields:
-                    if field not in existing_metadata:
-                        existing_metadata[field] = {}
-
-                return existing_metadata
-
-        return expected_fields
-
-    def save(self) -> None:
-        """Save metadata to file."""
-        with open(self.metadata_file, "w") as f:
-            json.dump(self.data, f)
-
-    def is_downloaded(self, param: str, date: datetime) -> bool:
-        """Check if a specific date-parameter combination exists."""
-        date_str = date.strftime("%Y%m%d")
-        return date_str in self.data[param]
-
-    def mark_downloaded(self, param: str, date: datetime) -> None:
-        """Mark a date-parameter combination as downloaded."""
-        date_str = date.strftime("%Y%m%d")
-        self.data[param][date_str] = datetime.now().isoformat()
+        self.flush_threshold = flush_threshold
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._pending: List[Tuple[str, str, str]] = []
+        self._seen: Set[Tuple[str, str]] = set()
+
+    async def __aenter__(self) -> "DownloadMetadata":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def connect(self) -> None:
+        """Open the metadata database and create the downloads table."""
+        if self._conn is None:
+            self._conn = await aiosqlite.connect(self.metadata_file)
+            await self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS downloads (
+                    param TEXT NOT NULL,
+                    date TEXT NOT NULL,  -- YYYYMMDD
+                    ts TEXT NOT NULL,  -- download timestamp
+                    PRIMARY KEY (param, date)
+                ) WITHOUT ROWID
+            """)
+            await self._conn.commit()
+            await self._import_legacy_metadata()
+
+            # Cache every (param, date) pair so lookups never hit the database
+            async with self._conn.execute(
+                "SELECT param, date FROM downloads"
+            ) as cursor:
+                self._seen = {(param, date_str) async for param, date_str in cursor}
+
+    async def close(self) -> None:
+        """Flush pending marks and close the metadata database."""
+        if self._conn is not None:
+            await self.flush()
+            await self._conn.close()
+            self._conn = None
+
+    async def _import_legacy_metadata(self) -> None:
+        """
+        Merge the old JSON metadata file into the database and rename it, so
+        marks written to it by older versions are not lost or imported twice.
+        """
+        legacy_file = self.metadata_file.with_suffix(".json")
+        if not legacy_file.exists():
+            return
+
+        legacy_metadata = orjson.loads(legacy_file.read_bytes())
+        await self._conn.executemany(
+            "INSERT OR IGNORE INTO downloads (param, date, ts) VALUES (?, ?, ?)",
+            [
+                (param, date_str, ts)
+                for param, dates in legacy_metadata.items()
+                for date_str, ts in dates.items()
+            ],
+        )
+        await self._conn.commit()
+        legacy_file.rename(legacy_file.with_suffix(".json.imported"))
+
+    async def flush(self) -> None:
+        """Write pending marks to the database in a single transaction."""
+        if self._conn is None:
+            raise RuntimeError(
+                "Metadata not connected. Use 'async with' or call connect()"
+            )
+        if not self._pending:
+            return
+
+        # Swap the buffer out first so marks made during the write aren't lost
+        rows, self._pending = self._pending, []
+        await self._conn.executemany(
+            "INSERT OR REPLACE INTO downloads (param, date, ts) VALUES (?, ?, ?)",
+            rows,
+        )
+        await self._conn.commit()
+
+    @property
+    def needs_flush(self) -> bool:
+        """Whether enough marks are pending to warrant a flush."""
+        return len(self._pending) >= self.flush_threshold
+
+    def is_downloaded(self, param: str, date_str: str) -> bool:
+        """Check if a specific date-parameter combination exists (date as YYYYMMDD)."""
+        return (param, date_str) in self._seen
+
+    def mark_downloaded(self, param: str, date_str: str) -> None:
+        """Mark a date-parameter combination as downloaded (written on flush)."""
+        self._pending.append((param, date_str, datetime.now().isoformat()))
+        self._seen.add((param, date_str))
 
 
 async def download_weather_data_for_period(
@@ -82,79 +130,72 @@ async def download_weather_data_for_period(
     new_files = 0
     skipped_files = 0
 
-    # Define method mapping with additional endpoints
-    METHOD_MAP = {
-        "temperature": lambda client: client.get_temperature,
-        "rainfall": lambda client: client.get_rainfall,
-        "humidity": lambda client: client.get_humidity,
-        "wind-speed": lambda client: client.get_wind_speed,
-        "wind-direction": lambda client: client.get_wind_direction,
-        "two-hour-forecast": lambda client: client.get_two_hour_forecast,
-        "twenty-four-hour-forecast": lambda client: client.get_24_hour_forecast,
-        "four-day-forecast": lambda client: client.get_four_day_forecast,
-        "wbgt": lambda client: client.get_wbgt,
-        "lightning": lambda client: client.get_lightning,
-        "pm25": lambda client: client.get_pm25,
-        "psi": lambda client: client.get_psi,
-        "uv-index": lambda client: client.get_uv_index,
-    }
-
-    async def save_response(client: WeatherAPIClient, date: datetime, param: str):
-        nonlocal new_files, skipped_files
-
-        # Quick metadata check unless forcing download
-        if not force_download and metadata.is_downloaded(param, date):
-            skipped_files += 1
-            return
-
-        if param not in METHOD_MAP:
-            print(f"Warning: Unknown parameter {param}")
-            return
+    def save_response(date: datetime, param: str, response: Any):
+        nonlocal new_files
 
         try:
-            method = METHOD_MAP[param](client)
-            response = await method(date)
-
             # Create parameter-specific directory
             param_dir = RAW_DATA_DIR / param
             param_dir.mkdir(exist_ok=True)
 
             # Save to file
             filename = param_dir / f"{date.strftime('%Y%m%d')}_{param}.json"
-            with open(filename, "w") as f:
-                json.dump(
-                    response.model_dump(by_alias=True, mode="json"), f, default=str
-                )
+            # pydantic-core serializes datetimes natively, no default= hook needed
+            with open(filename, "wb") as f:
+                f.write(response.model_dump_json(by_alias=True).encode())
 
             # Update metadata
-            metadata.mark_downloaded(param, date)
+            metadata.mark_downloaded(param, date.strftime("%Y%m%d"))
             new_files += 1
 
         except Exception as e:
-            print(f"\nError saving {param} data for {date}:")
-            print(f"Error type: {type(e)}")
-            print(f"Error message: {str(e)}")
-            if hasattr(e, "__dict__"):
-                print(f"Error details: {e.__dict__}")
-
-    async with WeatherAPIClient() as client:
-        total_days = (end_date - start_date).days + 1
-        date_range = [start_date + timedelta(days=x) for x in range(total_days)]
-
-        # Validate parameters
-        valid_params = [p for p in parameters if p in METHOD_MAP]
-        if len(valid_params) != len(parameters):
-            invalid_params = set(parameters) - set(valid_params)
-            print(f"Warning: Skipping invalid parameters: {invalid_params}")
-
-        for current_date in tqdm(date_range, desc="Downloading data"):
-            tasks = []
-            for param in valid_params:
-                tasks.append(save_response(client, current_date, param))
-
-            await asyncio.gather(*tasks)
-            metadata.save()  # Save after each day
-            # await asyncio.sleep(1)  # Rate limiting
+            report_error(date, param, e)
+
+    def report_error(date: datetime, param: str, e: BaseException):
+        print(f"\nError saving {param} data for {date}:")
+        print(f"Error type: {type(e)}")
+        print(f"Error message: {str(e)}")
+        if hasattr(e, "__dict__"):
+            print(f"Error details: {e.__dict__}")
+
+    try:
+        await metadata.connect()
+
+        async with WeatherAPIClient(
+            requests_per_minute=settings.API_REQUESTS_PER_MINUTE
+        ) as client:
+            total_days = (end_date - start_date).days + 1
+            date_range = [start_date + timedelta(days=x) for x in range(total_days)]
+
+            # Validate parameters
+            valid_params = [p for p in parameters if p in client.ENDPOINTS]
+            if len(valid_params) != len(parameters):
+                invalid_params = set(parameters) - set(valid_params)
+                print(f"Warning: Skipping invalid parameters: {invalid_params}")
+
+            for current_date in tqdm(date_range, desc="Downloading data"):
+                date_str = current_date.strftime("%Y%m%d")
+                # Quick metadata check unless forcing download
+                pending = [
+                    param
+                    for param in valid_params
+                    if force_download or not metadata.is_downloaded(param, date_str)
+                ]
+                skipped_files += len(valid_params) - len(pending)
+
+                # Fetch every parameter for the day at once
+                responses = await client.get_many(current_date, pending)
+                for param, response in zip(pending, responses):
+                    if isinstance(response, BaseException):
+                        report_error(current_date, param, response)
+                    else:
+                        save_response(current_date, param, response)
+
+                await metadata.flush()  # Save after each day
+                # await asyncio.sleep(1)  # Rate limiting
+    finally:
+        # Flushes anything left over and closes the database
+        await metadata.close()
 
     return new_files, skipped_files
 
@@ -1,14 +1,15 @@
 import asyncio
-import json
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from platform import processor
-from tqdm import tqdm
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel
 
 from projects.sg_weather.config.settings import get_settings
-from projects.sg_weather.src.ingestion.storage import WeatherStorage
+from projects.sg_weather.src.ingestion.storage import BatchResult, WeatherStorage
 from projects.sg_weather.src.schemas.weather import (
     UVIndexData,
     WeatherReadingData,
@@ -23,107 +24,164 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Pydantic model and data type for each parameter directory
+PARAM_TO_MODEL: Dict[str, Tuple[Type[BaseModel], str]] = {
+    "temperature": (WeatherReadingData, "reading"),
+    "rainfall": (WeatherReadingData, "reading"),
+    "humidity": (WeatherReadingData, "reading"),
+    "wind-direction": (WeatherReadingData, "reading"),
+    "wind-speed": (WeatherReadingData, "reading"),
+    "uv-index": (UVIndexData, "reading"),
+    "pm25": (PM25Data, "reading"),
+    "psi": (PSIData, "reading"),
+    "two-hour-forecast": (TwoHourForecastData, "forecast"),
+    "twenty-four-hour-forecast": (TwentyFourHourOutlookData, "forecast"),
+    "four-day-forecast": (FourDayOutlookData, "forecast"),
+}
+
+
+def load_raw_file(
+    file: Path, parameter: str
+) -> Optional[Tuple[str, str, None, Path, str, str]]:
+    """
+    Read, hash, validate and serialize a single raw file, returning None if it
+    can't be loaded. Runs in worker processes or threads.
+    Only the JSON and hash are sent back; storage needs nothing else, and
+    pickling the model too would send every record across the process boundary
+    twice.
+    """
+    try:
+        model_entry = PARAM_TO_MODEL.get(parameter)
+        if model_entry is None:
+            logger.warning(f"Unsupported parameter: {parameter}, skipping file: {file}")
+            return None
+
+        with open(file, "rb") as f:
+            raw = f.read()
+
+        # Parse and validate in one pass with the parameter's Pydantic model
+        model_cls, data_type = model_entry
+        model_data = model_cls.model_validate_json(raw)
+
+        # Hash the same bytes so storage doesn't read the file again, and
+        # serialize here so the event loop doesn't have to
+        return (
+            data_type,
+            parameter,
+            None,
+            file,
+            hashlib.sha256(raw).hexdigest(),
+            model_data.model_dump_json(),
+        )
+
+    except Exception as e:
+        print(f"Error loading {file}: {e}")
+        return None
+
 
 async def process_and_load_raw_files(
     start_date: datetime,
     end_date: datetime,
     parameters: Optional[List[str]] = None,
-    batch_size: int = 300,
+    batch_size: Optional[int] = None,
 ) -> Dict[str, int]:
-    storage = WeatherStorage(settings.database_url, batch_size=300)
+    batch_size = batch_size or settings.DB_BATCH_SIZE
+    storage = WeatherStorage(settings.database_url, batch_size=batch_size)
     await storage.connect()
     await storage.initialize_tables()
 
     stats = {"processed": 0, "skipped": 0, "failed": 0}
 
     try:
-        files_to_process = []
-
         # Filter directories by parameter if specified
-        param_dirs = settings.RAW_DATA_DIR.glob("*")
-        if parameters:
-            param_dirs = [d for d in param_dirs if d.name in parameters and d.is_dir()]
-        else:
-            param_dirs = [d for d in param_dirs if d.is_dir()]
-
-        for param_dir in param_dirs:
-            parameter = param_dir.name
-            print(f"\nProcessing {parameter}...")
-
-            json_files = list(param_dir.glob("*.json"))
-
-            # Filter files by date range
-            date_filtered_files = []
-            for file in json_files:
-                # Extract date from filename (YYYYMMDD-parameter.json)
-                try:
-                    date_str = file.stem.split("_")[0]
-                    file_date = datetime.strptime(date_str, "%Y%m%d")
-
-                    # Check if file date is within the specified range
-                    if start_date <= file_date <= end_date:
-                        date_filtered_files.append(file)
-                except (ValueError, IndexError):
-                    logger.warning(f"Couldn't parse date from filename: {file}")
-
-            logger.info(
-                f"Found {len(date_filtered_files)} files within date range for {parameter}"
-            )
-            for i in range(0, len(date_filtered_files), 10):
-                chunk = json_files[i : i + 10]
-
-                for file in chunk:
-                    try:
-                        with open(file) as f:
-                            data = json.load(f)
-
-                            # Use appropriate Pydantic model based on parameter
-                            if parameter in [
-                                "temperature",
-                                "rainfall",
-                                "humidity",
-                                "wind-direction",
-                                "wind-speed",
-                            ]:
-                                model_data = WeatherReadingData(**data)
-                                data_type = "reading"
-                            elif parameter == "uv-index":
-                                model_data = UVIndexData(**data)
-                                data_type = "reading"
-                            elif parameter == "pm25":
-                                model_data = PM25Data(**data)
-                                data_type = "reading"
-                            elif parameter == "psi":
-                                model_data = PSIData(**data)
-                                data_type = "reading"
-                            elif parameter == "two-hour-forecast":
-                                model_data = TwoHourForecastData(**data)
-                                data_type = "forecast"
-                            elif parameter == "twenty-four-hour-forecast":
-                                model_data = TwentyFourHourOutlookData(**data)
-                                data_type = "forecast"
-                            elif parameter == "four-day-forecast":
-                                model_data = FourDayOutlookData(**data)
-                                data_type = "forecast"
-                            else:
-                                logger.warning(
-                                    f"Unsupported parameter: {parameter}, skipping file: {file}"
-                                )
-
-                            # await storage.store_data(data_type, parameter, model_data, file)
-                            files_to_process.append(
-                                (data_type, parameter, model_data, file)
+        with os.scandir(settings.RAW_DATA_DIR) as entries:
+            param_dirs = [
+                Path(entry.path)
+                for entry in entries
+                if (not parameters or entry.name in parameters) and entry.is_dir()
+            ]
+
+        # Every day in the range as a YYYYMMDD filename prefix
+        total_days = (end_date.date() - start_date.date()).days + 1
+        valid_dates = {
+            (start_date + timedelta(days=x)).strftime("%Y%m%d")
+            for x in range(total_days)
+        }
+
+        # Loaded files flow through a bounded queue to the database writer, so
+        # only a couple of batches are held in memory at any time
+        queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 2)
+        result = BatchResult()
+
+        async def produce() -> None:
+            for param_dir in param_dirs:
+                parameter = param_dir.name
+                print(f"\nProcessing {parameter}...")
+
+                # Filter files by date range; filenames start with YYYYMMDD, so
+                # a set lookup on the prefix replaces parsing each date
+                with os.scandir(param_dir) as entries:
+                    date_filtered_files = [
+                        Path(entry.path)
+                        for entry in entries
+                        if entry.name.endswith(".json")
+                        and entry.name[:8] in valid_dates
+                        and entry.is_file()
+                    ]
+
+                logger.info(
+                    f"Found {len(date_filtered_files)} files within date range for {parameter}"
+                )
+                for i in range(0, len(date_filtered_files), chunk_size):
+                    chunk = date_filtered_files[i : i + chunk_size]
+
+                    # Read and validate the chunk across the worker processes
+                    results = await asyncio.gather(
+                        *[
+                            loop.run_in_executor(
+                                executor, load_raw_file, file, parameter
                             )
-
-                    except Exception as e:
-                        print(f"Error loading {file}: {e}")
-                        stats["failed"] += 1
-
-        # Process all files in batches
-        logger.info(
-            f"Preparing to process {len(files_to_process)} files in batches of {batch_size}"
-        )
-        result = await storage.store_data_batch(files_to_process)
+                            for file in chunk
+                        ]
+                    )
+                    for loaded in results:
+                        if loaded is None:
+                            stats["failed"] += 1
+                        else:
+                            await queue.put(loaded)
+
+            await queue.put(None)  # No more files
+
+        async def consume() -> None:
+            batch = []
+            while True:
+                item = await queue.get()
+                if item is not None:
+                    batch.append(item)
+                if batch and (item is None or len(batch) >= batch_size):
+                    batch_result = await storage.store_data_batch(batch)
+                    result.processed.extend(batch_result.processed)
+                    result.skipped.extend(batch_result.skipped)
+                    result.failed.extend(batch_result.failed)
+                    batch = []
+                if item is None:
+                    return
+
+        # Validation is CPU-bound, so spread it over one process per core
+        workers = os.cpu_count() or 1
+        chunk_size = workers * 2
+        loop = asyncio.get_running_loop()
+
+        logger.info(f"Processing files in batches of {batch_size}")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tasks = [asyncio.create_task(produce()), asyncio.create_task(consume())]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # Don't leave one side blocked on the queue if the other failed
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
         # Update stats
         stats["processed"] = len(result.processed)
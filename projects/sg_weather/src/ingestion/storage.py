@@ -1,15 +1,77 @@
+import asyncio
 from datetime import datetime
-import json
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple, NamedTuple
 import asyncpg
 from logging import getLogger
 from pydantic import BaseModel
 from pathlib import Path
 import hashlib
+import os
 from dataclasses import dataclass
 
+from projects.sg_weather.config.settings import get_settings
+
 logger = getLogger(__name__)
 
+# Batches smaller than this are upserted with a single UNNEST insert instead of COPY
+COPY_MIN_RECORDS = 1000
+
+# (column, postgres type) for each upserted table, in record order
+RAW_DATA_COLUMNS = (
+    ("data_timestamp", "timestamptz"),
+    ("data_type", "text"),
+    ("parameter", "text"),
+    ("validated_data", "jsonb"),
+)
+METADATA_COLUMNS = (
+    ("data_timestamp", "timestamptz"),
+    ("data_type", "text"),
+    ("parameter", "text"),
+    ("file_path", "text"),
+    ("file_hash", "text"),
+)
+
+# ON CONFLICT SET clauses; every row takes the update path so a changed file is
+# never dropped, and metadata rows whose hash is unchanged are left untouched
+RAW_DATA_UPDATE = """
+    validated_data = EXCLUDED.validated_data,
+    ingestion_timestamp = NOW()
+"""
+METADATA_UPDATE = """
+    file_path = EXCLUDED.file_path,
+    file_hash = EXCLUDED.file_hash,
+    load_timestamp = NOW()
+    WHERE weather_data_metadata.file_hash IS DISTINCT FROM EXCLUDED.file_hash
+"""
+
+
+@lru_cache(maxsize=None)
+def _upsert_sql(
+    table: str, columns: Tuple[Tuple[str, str], ...], update_set: str
+) -> Tuple[str, str]:
+    """
+    Build the (UNNEST insert, staging merge) statements for a table once, so every
+    batch sends identical text and hits asyncpg's per-connection statement cache.
+    """
+    column_list = ", ".join(name for name, _ in columns)
+    conflict_clause = f"""
+        ON CONFLICT (data_timestamp, data_type, parameter)
+        DO UPDATE SET {update_set}
+    """
+    arrays = ", ".join(
+        f"${i}::{pg_type}[]" for i, (_, pg_type) in enumerate(columns, 1)
+    )
+    unnest_sql = (
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT * FROM UNNEST({arrays}) " + conflict_clause
+    )
+    merge_sql = (
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT {column_list} FROM {table}_stage " + conflict_clause
+    )
+    return unnest_sql, merge_sql
+
 
 class MetadataKey(NamedTuple):
     """
@@ -21,15 +83,6 @@ class MetadataKey(NamedTuple):
     parameter: str
 
 
-@dataclass
-class MetadataEntry:
-    """Cached metadata entry."""
-
-    file_path: str
-    file_hash: str
-    load_timestamp: datetime
-
-
 @dataclass
 class WeatherDataFile:
     """Container for weather data file information."""
@@ -37,9 +90,10 @@ class WeatherDataFile:
     timestamp: datetime
     data_type: str
     parameter: str
-    model_data: BaseModel
+    model_data: Optional[BaseModel]  # None when the loader only kept its JSON
     file_path: Path
     file_hash: str
+    validated_json: str  # model_data serialized once for the JSONB column
 
 
 class BatchResult:
@@ -54,23 +108,30 @@ class BatchResult:
 class WeatherStorage:
     """Simplified storage interface for weather data."""
 
-    def __init__(self, dsn: str, batch_size: int = 100):
+    def __init__(self, dsn: str, batch_size: Optional[int] = None):
         self.dsn = dsn
         self._pool: Optional[asyncpg.Pool] = None
-        self.batch_size = batch_size
-        self._metadata_cache: Dict[MetadataKey, MetadataEntry] = {}
+        self.batch_size = batch_size or get_settings().DB_BATCH_SIZE
+        # Metadata key -> hash of the file last loaded for it
+        self._metadata_cache: Dict[MetadataKey, str] = {}
         self._cache_initialized = False
+        # Serializes cache loads so concurrent callers issue a single query
+        self._cache_lock = asyncio.Lock()
+        # (path, mtime_ns, size) -> SHA256 hex digest
+        self._hash_cache: Dict[Tuple[str, int, int], str] = {}
 
     async def connect(self) -> None:
-        if self._pool is None:
-            self._pool = await asyncpg.create_pool(
-                self.dsn,
-                min_size=1,  # Min no connections
-                max_size=2,  # Max no connections
-                max_queries=50,  # max queries per connection before recycling
-                max_inactive_connection_lifetime=300.0,  # 5 miniutes
-                timeout=60.0,  # Connection timesout
-            )
+        if self._pool is not None:
+            return
+        settings = get_settings()
+        self._pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=settings.DB_POOL_MIN_SIZE,  # Min no connections
+            max_size=settings.DB_POOL_MAX_SIZE,  # Max no connections
+            max_queries=50000,  # max queries per connection before recycling
+            max_inactive_connection_lifetime=600.0,  # 10 minutes
+            timeout=60.0,  # Connection timesout
+        )
         await self.initialize_tables()
         await self._initialize_metadata_cache()
         logger.info("Connected to database with optimized pool settings")
@@ -160,29 +221,37 @@ class WeatherStorage:
             logger.info("Metadata tracking table created/verified")
 
     def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA256 hash of file content."""
+        """Calculate SHA256 hash of file content, memoized on path, mtime and size."""
+        stat = os.stat(file_path)
+        key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        cached_hash = self._hash_cache.get(key)
+        if cached_hash is not None:
+            return cached_hash
+
         sha256_hash = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
+            while byte_block := f.read(1 << 20):  # 1 MiB blocks
                 sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        file_hash = sha256_hash.hexdigest()
+        self._hash_cache[key] = file_hash
+        return file_hash
 
     async def is_file_already_processed(
-        self, data_timestamp: datetime, data_type: str, parameter: str, file_path: Path
+        self,
+        data_timestamp: datetime,
+        data_type: str,
+        parameter: str,
+        file_path: Path,
+        file_hash: Optional[str] = None,
     ) -> Tuple[bool, Optional[str]]:
         """Check if file has been processed and hasn't changed using cached metadata."""
         if not self._cache_initialized:
             await self._initialize_metadata_cache()
 
         key = MetadataKey(data_timestamp, data_type, parameter)
-        current_hash = self._calculate_file_hash(file_path)
+        current_hash = file_hash or self._calculate_file_hash(file_path)
 
-        if key in self._metadata_cache:
-            cached_entry = self._metadata_cache[key]
-            if cached_entry.file_path == current_hash:
-                return True, current_hash
-
-        return False, current_hash
+        return self._metadata_cache.get(key) == current_hash, current_hash
 
     async def store_data(
         self, data_type: str, parameter: str, model_data: BaseModel, file_path: Path
@@ -228,7 +297,7 @@ class WeatherStorage:
                     timestamp,
                     data_type,
                     parameter,
-                    json.dumps(model_data.model_dump(mode="json")),
+                    model_data.model_dump_json(),
                 )
                 logger.info("Weather data updated")
 
@@ -258,23 +327,40 @@ class WeatherStorage:
                 logger.info("Metadata updated")
                 logger.info("Transaction completed successfully")
 
+        self._metadata_cache[MetadataKey(timestamp, data_type, parameter)] = file_hash
+
     def _extract_timestamp(self, filename: Path) -> datetime:
         """Extract the primary timestamp from filename (YYYYMMDD_parameter.json)"""
         # Get date from filename
         date_str = filename.stem.split("_")[0]  # Gets YYYYMMDD
         base_date = datetime.strptime(date_str, "%Y%m%d")
-        return base_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        # Local midnight, made aware so it equals the UTC value read back from
+        # TIMESTAMPTZ; asyncpg stored the naive form as host-local time too
+        return base_date.astimezone()
 
     async def prepare_file(
-        self, data_type: str, parameter: str, model_data: BaseModel, file_path: Path
+        self,
+        data_type: str,
+        parameter: str,
+        model_data: Optional[BaseModel],
+        file_path: Path,
+        file_hash: Optional[str] = None,
+        validated_json: Optional[str] = None,
     ) -> Optional[WeatherDataFile]:
-        """Prepare a file for batch processing."""
+        """
+        Prepare a file for batch processing.
+        Loaders that already read the file pass its hash in to avoid a second read,
+        and may pass the model's JSON if they serialized it off the event loop, in
+        which case model_data can be None.
+        """
         timestamp = self._extract_timestamp(file_path)
-        file_hash = self._calculate_file_hash(file_path)
+        if file_hash is None:
+            # Hash off the event loop so DB I/O can proceed meanwhile
+            file_hash = await asyncio.to_thread(self._calculate_file_hash, file_path)
 
         # Check if file needs processing
         already_processed, _ = await self.is_file_already_processed(
-            timestamp, data_type, parameter, file_path
+            timestamp, data_type, parameter, file_path, file_hash
         )
 
         if already_processed:
@@ -288,6 +374,74 @@ class WeatherStorage:
             model_data=model_data,
             file_path=file_path,
             file_hash=file_hash,
+            validated_json=validated_json or model_data.model_dump_json(),
+        )
+
+    async def _upsert_records(
+        self,
+        conn: asyncpg.Connection,
+        table: str,
+        columns: Tuple[Tuple[str, str], ...],
+        update_set: str,
+        records: List[tuple],
+    ) -> None:
+        """
+        Upsert records into a table keyed on (data_timestamp, data_type, parameter).
+        Larger batches are streamed with binary COPY into a temporary staging
+        table and merged in a single statement; small ones are sent as one
+        INSERT ... SELECT FROM UNNEST over per-column arrays.
+        Must be called inside a transaction. The staging table is private to this
+        connection and dropped with the transaction, so concurrent loaders never
+        see each other's rows.
+        """
+        unnest_sql, merge_sql = _upsert_sql(table, columns, update_set)
+
+        if len(records) < COPY_MIN_RECORDS:
+            await conn.execute(unnest_sql, *(list(column) for column in zip(*records)))
+            return
+
+        stage_table = f"{table}_stage"
+        await conn.execute(
+            f"CREATE TEMP TABLE {stage_table} "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await conn.copy_records_to_table(
+            stage_table, records=records, columns=[name for name, _ in columns]
+        )
+        await conn.execute(merge_sql)
+        # Dropped now rather than at commit so the table can be staged again
+        # within the same transaction
+        await conn.execute(f"DROP TABLE {stage_table}")
+
+    async def _write_files(
+        self, conn: asyncpg.Connection, files: List[WeatherDataFile]
+    ) -> None:
+        """Upsert raw data and metadata rows for files."""
+        # Prepare bulk insert data
+        weather_data_records = [
+            (f.timestamp, f.data_type, f.parameter, f.validated_json) for f in files
+        ]
+        metadata_records = [
+            (f.timestamp, f.data_type, f.parameter, str(f.file_path), f.file_hash)
+            for f in files
+        ]
+
+        # Bulk insert weather data
+        await self._upsert_records(
+            conn,
+            "raw_weather_data",
+            RAW_DATA_COLUMNS,
+            RAW_DATA_UPDATE,
+            weather_data_records,
+        )
+
+        # Bulk insert metadata
+        await self._upsert_records(
+            conn,
+            "weather_data_metadata",
+            METADATA_COLUMNS,
+            METADATA_UPDATE,
+            metadata_records,
         )
 
     async def process_batch(self, files: List[WeatherDataFile]) -> BatchResult:
@@ -302,111 +456,80 @@ class WeatherStorage:
         async with self._pool.acquire() as conn:
             try:
                 async with conn.transaction():
-                    # Prepare bulk insert data
-                    weather_data_records = [
-                        (
-                            f.timestamp,
-                            f.data_type,
-                            f.parameter,
-                            json.dumps(f.model_data.model_dump(mode="json")),
-                        )
-                        for f in files
-                    ]
-
-                    metadata_records = [
-                        (
-                            f.timestamp,
-                            f.data_type,
-                            f.parameter,
-                            str(f.file_path),
-                            f.file_hash,
-                        )
-                        for f in files
-                    ]
-
-                    # Bulk insert weather data
-                    await conn.executemany(
-                        """
-                        INSERT INTO raw_weather_data (
-                            data_timestamp, data_type, parameter, validated_data
-                        )
-                        VALUES ($1, $2, $3, $4)
-                        ON CONFLICT (data_timestamp, data_type, parameter) 
-                        DO UPDATE SET 
-                            validated_data = EXCLUDED.validated_data,
-                            ingestion_timestamp = NOW()
-                    """,
-                        weather_data_records,
-                    )
-
-                    # Bulk insert metadata
-                    await conn.executemany(
-                        """
-                        INSERT INTO weather_data_metadata (
-                            data_timestamp, data_type, parameter, file_path, file_hash
-                        )
-                        VALUES ($1, $2, $3, $4, $5)
-                        ON CONFLICT (data_timestamp, data_type, parameter) 
-                        DO UPDATE SET 
-                            file_path = EXCLUDED.file_path,
-                            file_hash = EXCLUDED.file_hash,
-                            load_timestamp = NOW()
-                    """,
-                        metadata_records,
-                    )
-
-                    # Update metadata_cache with new entries
-                    for file in files:
-                        key = MetadataKey(
-                            file.timestamp, file.data_type, file.parameter
-                        )
-                        entry = MetadataEntry(
-                            str(file.file_path), file.file_hash, datetime.now()
-                        )
-                        self._metadata_cache[key] = entry
-
-                    result.processed.extend(f.file_path for f in files)
-                    logger.info(f"Successfully processed batch of {len(files)} files")
-
+                    await self._write_files(conn, files)
             except Exception as e:
                 logger.error(f"Error processing batch: {e}")
                 result.failed.extend((f.file_path, str(e)) for f in files)
+                return result
 
+        # Update metadata_cache once the rows are committed
+        for file in files:
+            key = MetadataKey(file.timestamp, file.data_type, file.parameter)
+            self._metadata_cache[key] = file.file_hash
+
+        result.processed.extend(f.file_path for f in files)
+        logger.info(f"Successfully processed batch of {len(files)} files")
         return result
 
     async def store_data_batch(
-        self, files_to_process: List[Tuple[str, str, BaseModel, Path]]
+        self,
+        files_to_process: List[
+            Tuple[str, str, Optional[BaseModel], Path, Optional[str], Optional[str]]
+        ],
+        batch_size: Optional[int] = None,
     ) -> BatchResult:
-        """Process multiple files in batches."""
+        """
+        Process multiple files in batches.
+        Each item is (data_type, parameter, model_data, file_path, file_hash,
+        validated_json); files without a hash are hashed in worker threads while
+        the previous batch is being written to the database.
+        """
+        batch_size = batch_size or self.batch_size
         total_result = BatchResult()
-        current_batch: List[WeatherDataFile] = []
-
-        for data_type, parameter, model_data, file_path in files_to_process:
-            try:
-                prepared_file = await self.prepare_file(
-                    data_type, parameter, model_data, file_path
-                )
-
-                if prepared_file is None:
-                    total_result.skipped.append(file_path)
-                    continue
-
-                current_batch.append(prepared_file)
-
-                # Process batch if it reaches the size limit
-                if len(current_batch) >= self.batch_size:
-                    batch_result = await self.process_batch(current_batch)
-                    self._merge_results(total_result, batch_result)
-                    current_batch = []
-
-            except Exception as e:
-                logger.error(f"Error preparing file {file_path}: {e}")
-                total_result.failed.append((file_path, str(e)))
-
-        # Process remaining files
-        if current_batch:
-            batch_result = await self.process_batch(current_batch)
-            self._merge_results(total_result, batch_result)
+        hash_sem = asyncio.Semaphore(os.cpu_count() or 1)
+
+        async def prepare(
+            item: Tuple[
+                str, str, Optional[BaseModel], Path, Optional[str], Optional[str]
+            ],
+        ) -> Tuple[Optional[WeatherDataFile], Optional[Exception]]:
+            async with hash_sem:
+                try:
+                    prepared_file = await self.prepare_file(*item)
+                    return prepared_file, None
+                except Exception as e:
+                    return None, e
+
+        pending_batch: Optional[asyncio.Task] = None
+        try:
+            for i in range(0, len(files_to_process), batch_size):
+                chunk = files_to_process[i : i + batch_size]
+                prepared = await asyncio.gather(*[prepare(item) for item in chunk])
+
+                current_batch: List[WeatherDataFile] = []
+                for (_, _, _, file_path, _, _), (prepared_file, error) in zip(
+                    chunk, prepared
+                ):
+                    if error is not None:
+                        logger.error(f"Error preparing file {file_path}: {error}")
+                        total_result.failed.append((file_path, str(error)))
+                    elif prepared_file is None:
+                        total_result.skipped.append(file_path)
+                    else:
+                        current_batch.append(prepared_file)
+
+                # Wait for the previous batch, then start writing this one while
+                # the next chunk is hashed
+                if pending_batch is not None:
+                    self._merge_results(total_result, await pending_batch)
+                pending_batch = asyncio.create_task(self.process_batch(current_batch))
+
+            if pending_batch is not None:
+                self._merge_results(total_result, await pending_batch)
+                pending_batch = None
+        finally:
+            if pending_batch is not None:
+                pending_batch.cancel()
 
         return total_result
 
@@ -420,33 +543,46 @@ class WeatherStorage:
 
     async def _initialize_metadata_cache(self) -> None:
         """Load all metadata into memory."""
-        if not self._pool or self._cache_initialized:
-            return
+        async with self._cache_lock:
+            # Callers that waited on the lock find the cache already loaded
+            if not self._pool or self._cache_initialized:
+                return
+
+            logger.info("Initializing metadata cache...")
+            async with self._pool.acquire() as conn:
+                # Fetch all metadata in a single query
+                rows = await conn.fetch("""
+                    SELECT
+                        data_timestamp,
+                        data_type,
+                        parameter,
+                        file_hash
+                    FROM weather_data_metadata
+                """)
 
-        logger.info("Initializing metadata cache...")
-        async with self._pool.acquire() as conn:
-            # Fetch all metadata in a single query
-            rows = await conn.fetch("""
-                SELECT
-                    data_timestamp,
-                    data_type,
-                    parameter,
-                    file_path,
-                    file_hash,
-                    load_timestamp
-                FROM weather_data_metadata
-            """)
+            # Build cache
+            self._metadata_cache.clear()
+            for row in rows:
+                # Aware UTC values; they hash and compare equal to the aware local
+                # timestamps from _extract_timestamp for the same instant
+                key = MetadataKey(
+                    row["data_timestamp"], row["data_type"], row["parameter"]
+                )
+                self._metadata_cache[key] = row["file_hash"]
 
-        # Build cache
-        self._metadata_cache.clear()
-        for row in rows:
-            key = MetadataKey(row["data_timestamp"], row["data_type"], row["parameter"])
-            entry = MetadataEntry(
-                row["file_path"], row["file_hash"], row["load_timestamp"]
+            self._cache_initialized = True
+            logger.info(
+                f"Metadata cache initialized with {len(self._metadata_cache)} entries"
             )
-            self._metadata_cache[key] = entry
 
-        self._cache_initialized = True
-        logger.info(
-            f"Metadata cache initialized with {len(self._metadata_cache)} entries"
-        )
+
+@lru_cache(maxsize=1)
+def get_storage() -> WeatherStorage:
+    """Get the process-wide WeatherStorage instance."""
+    return WeatherStorage(get_settings().database_url)
+
+
+async def close_storage() -> None:
+    """Close the shared storage pool, if one was opened."""
+    if get_storage.cache_info().currsize:
+        await get_storage().disconnect()
@@ -23,7 +23,7 @@ FROM
     jsonb_array_elements(record->'forecasts') AS forecast
 WHERE 
     r.parameter = 'four-day-forecast'
-    AND DATE(r.data_timestamp) = $1
+    AND r.data_timestamp >= $1 AND r.data_timestamp < $1 + 1
 ON CONFLICT (timestamp, forecast_date) DO UPDATE SET
     day_of_week = EXCLUDED.day_of_week,
     temperature_low = EXCLUDED.temperature_low,
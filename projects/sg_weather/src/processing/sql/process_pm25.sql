@@ -12,7 +12,7 @@ FROM
     jsonb_each_text(item->'readings'->'pm25_one_hourly') as regions(region, value)
 WHERE 
     r.parameter = 'pm25'
-    AND DATE(r.data_timestamp) = $1
+    AND r.data_timestamp >= $1 AND r.data_timestamp < $1 + 1
 ON CONFLICT (timestamp, station_id, parameter) DO UPDATE SET
     value = EXCLUDED.value;
 
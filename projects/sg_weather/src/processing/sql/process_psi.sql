@@ -25,7 +25,7 @@ FROM
     jsonb_each_text(metrics.values) as regions(region, value)
 WHERE 
     r.parameter = 'psi'
-    AND DATE(r.data_timestamp) = $1
+    AND r.data_timestamp >= $1 AND r.data_timestamp < $1 + 1
 ON CONFLICT (timestamp, station_id, parameter) DO UPDATE SET
     value = EXCLUDED.value;
 
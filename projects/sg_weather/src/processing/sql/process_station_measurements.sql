@@ -12,7 +12,7 @@ WITH readings_data AS (
     jsonb_array_elements(reading->'data') as reading_data
   WHERE 
     r.parameter IN ('temperature', 'rainfall', 'humidity', 'wind-speed', 'wind-direction')
-    AND DATE(r.data_timestamp) = $1
+    AND r.data_timestamp >= $1 AND r.data_timestamp < $1 + 1
 )
 SELECT * FROM readings_data
 ON CONFLICT (timestamp, station_id, parameter) DO UPDATE SET
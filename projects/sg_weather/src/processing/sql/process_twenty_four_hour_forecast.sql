@@ -28,7 +28,7 @@ WITH regional_data AS (
         jsonb_array_elements(record->'periods') AS period
     WHERE 
         r.parameter = 'twenty-four-hour-forecast'
-        AND DATE(r.data_timestamp) = $1
+        AND r.data_timestamp >= $1 AND r.data_timestamp < $1 + 1
 )
 SELECT * FROM regional_data
 ON CONFLICT (timestamp, region, period_start) DO UPDATE SET
@@ -61,7 +61,7 @@ FROM
     jsonb_array_elements(r.validated_data->'records') AS record
 WHERE 
     r.parameter = 'twenty-four-hour-forecast'
-    AND DATE(r.data_timestamp) = $1
+    AND r.data_timestamp >= $1 AND r.data_timestamp < $1 + 1
 ON CONFLICT (timestamp, period_start) DO UPDATE SET
     period_end = EXCLUDED.period_end,
     temperature_low = EXCLUDED.temperature_low,
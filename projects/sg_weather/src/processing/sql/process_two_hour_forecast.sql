@@ -14,7 +14,7 @@ FROM
     jsonb_array_elements(item->'forecasts') as forecast
 WHERE 
     r.parameter = 'two-hour-forecast'
-    AND DATE(r.data_timestamp) = $1
+    AND r.data_timestamp >= $1 AND r.data_timestamp < $1 + 1
 ON CONFLICT (timestamp, area) DO UPDATE SET
     valid_from = EXCLUDED.valid_from,
     valid_to = EXCLUDED.valid_to,
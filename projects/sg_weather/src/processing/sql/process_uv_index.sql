@@ -8,7 +8,7 @@ with
         from
             raw_weather_data r,
             jsonb_array_elements(r.validated_data -> 'records') as record
-        where r.parameter = 'uv-index' and date(r.data_timestamp) = $1
+        where r.parameter = 'uv-index' and r.data_timestamp >= $1 and r.data_timestamp < $1 + 1
     )
     insert into weather_transformed.national_measurements(
         timestamp, parameter, value, units
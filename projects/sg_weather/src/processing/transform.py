@@ -15,23 +15,78 @@ settings = get_settings()
 SQL_DIR = Path(__file__).parent / "sql"
 
 
+def load_sql_cache() -> Dict[str, List[str]]:
+    """Read every SQL file once, split into its statements."""
+    return {
+        path.name: [s.strip() for s in path.read_text().split(";") if s.strip()]
+        for path in SQL_DIR.glob("*.sql")
+    }
+
+
+SQL_CACHE = load_sql_cache()
+
+# Extra rounds for dates whose transform failed, and the delay before the
+# first retry round (doubled each round)
+DATE_RETRIES = 2
+DATE_RETRY_DELAY = 5.0
+
+# Per-date transforms, run in this order as a single script
+DATE_SQL_FILES = [
+    "process_station_measurements.sql",
+    "process_pm25.sql",
+    "process_psi.sql",
+    "process_uv_index.sql",
+    "process_two_hour_forecast.sql",
+    "process_twenty_four_hour_forecast.sql",
+    "process_four_day_forecast.sql",
+]
+
+
+def load_date_sql_script() -> str:
+    """Concatenate the per-date SQL files into one script with a {date} placeholder."""
+    script = ";\n".join(
+        statement for name in DATE_SQL_FILES for statement in SQL_CACHE[name]
+    )
+    return script.replace("{", "{{").replace("}", "}}").replace("$1", "{date}") + ";"
+
+
+DATE_SQL_SCRIPT = load_date_sql_script()
+
+
 async def execute_sql_file(conn, file_path, params={}):
     """Execute SQL statements from a file."""
     logger.info(f"Executing SQL file: {file_path}")
-    with open(file_path, "r") as f:
-        sql = f.read()
-
-    # Split by semicolon to handle multiple statements
-    statements = sql.split(";")
-    for statement in statements:
-        statement = statement.strip()
-        if statement:
-            try:
-                await conn.execute(statement, *params.values())
-            except Exception as e:
-                logger.error(f"Error executing SQL: {e}")
-                logger.error(f"Statement: {statement}")
-                raise
+    for statement in SQL_CACHE[Path(file_path).name]:
+        try:
+            await conn.execute(statement, *params.values())
+        except Exception as e:
+            logger.error(f"Error executing SQL: {e}")
+            logger.error(f"Statement: {statement}")
+            raise
+
+
+def as_date(value):
+    """Return a datetime's calendar date; dates and None are returned unchanged."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def split_dates(start_date, end_date, completed_dates):
+    """
+    Split the days from start_date to end_date into those still to transform and
+    a count of those already completed.
+    Bounds may be datetimes; metadata is keyed by DATE, and a datetime never
+    compares equal to a date, so days are compared as dates.
+    """
+    current_date, end_date = as_date(start_date), as_date(end_date)
+    dates_to_process = []
+    skipped_dates = 0
+    while current_date <= end_date:
+        if current_date not in completed_dates:
+            dates_to_process.append(current_date)
+        else:
+            skipped_dates += 1
+        current_date += timedelta(days=1)
+    return dates_to_process, skipped_dates
 
 
 async def create_transform_metadata_table(pool):
@@ -48,106 +103,85 @@ async def create_transform_metadata_table(pool):
         """)
 
 
-async def check_date_for_processing(pool, date):
-    """
-    Check if a date needs processing or reprocessing
-    """
+async def get_completed_dates(pool, start_date, end_date):
+    """Return the set of dates in the range already marked completed."""
     async with pool.acquire() as conn:
-        record = await conn.fetchrow(
-            "SELECT status FROM weather_transformed.transform_metadata WHERE date = $1",
-            date,
+        records = await conn.fetch(
+            """
+        SELECT date FROM weather_transformed.transform_metadata
+        WHERE status = 'completed' AND date BETWEEN $1 AND $2
+        """,
+            start_date,
+            end_date,
         )
-        if not record:
-            return True
-        return record["status"] != "completed"
+        return {record["date"] for record in records}
 
 
-async def mark_date_status(pool, date, status, parameters=None):
-    """Mark a date's processing status in metadata."""
+async def mark_dates_started(pool, dates):
+    """Mark all dates as started in metadata, recording each date's parameters."""
     async with pool.acquire() as conn:
-        if status == "started":
-            # Convert parameters list to JSONB
-            params_json = json.dumps(parameters) if parameters else "{}"
-
-            await conn.execute(
-                """
-            INSERT INTO weather_transformed.transform_metadata
-            (date, parameters, started_at, status)
-            VALUES ($1, $2, NOW(), $3)
-            ON CONFLICT (date) DO UPDATE SET
-            started_at = NOW(),
-            parameters = $2::jsonb,
-            status = $3
-            """,
-                date,
-                params_json,
-                status,
-            )
-        else:
-            await conn.execute(
-                """
-            UPDATE weather_transformed.transform_metadata
-            SET completed_at = NOW(), status = $1
-            WHERE date = $2
-            """,
-                status,
-                date,
-            )
+        # Track available parameters for every date in one pass
+        records = await conn.fetch(
+            """
+        SELECT DATE(data_timestamp) AS date, array_agg(DISTINCT parameter) AS parameters
+        FROM raw_weather_data
+        WHERE data_timestamp >= $1::date AND data_timestamp < $2::date
+        GROUP BY 1
+        """,
+            min(dates),
+            max(dates) + timedelta(days=1),
+        )
+        parameters = {record["date"]: record["parameters"] for record in records}
 
+        # Convert parameters lists to JSON
+        params_json = [
+            json.dumps(parameters[date]) if date in parameters else "{}"
+            for date in dates
+        ]
+
+        await conn.execute(
+            """
+        INSERT INTO weather_transformed.transform_metadata
+        (date, parameters, started_at, status)
+        SELECT date, parameters::json, NOW(), 'started'
+        FROM UNNEST($1::date[], $2::text[]) AS t(date, parameters)
+        ON CONFLICT (date) DO UPDATE SET
+        started_at = NOW(),
+        parameters = EXCLUDED.parameters,
+        status = EXCLUDED.status
+        """,
+            dates,
+            params_json,
+        )
 
-async def transform_date_measurements(pool, date):
-    """
-    Transform measurements for a specific date.
-    """
-    logger.info(f"Processing measurements for date: {date}")
 
-    # Track available parameters for this date
+async def mark_date_status(pool, date, status):
+    """Mark a date's final processing status in metadata."""
     async with pool.acquire() as conn:
-        parameters = await conn.fetch(
+        await conn.execute(
             """
-        SELECT DISTINCT parameter
-        FROM raw_weather_data
-        WHERE DATE(data_timestamp) = $1
+        UPDATE weather_transformed.transform_metadata
+        SET completed_at = NOW(), status = $1
+        WHERE date = $2
         """,
+            status,
             date,
         )
-        param_list = [row["parameter"] for row in parameters]
 
-    # Mark date as started in metadata
-    await mark_date_status(pool, date, "started", param_list)
+
+async def transform_date_measurements(pool, date):
+    """
+    Transform measurements for a specific date.
+    """
+    logger.info(f"Processing measurements for date: {date}")
 
     try:
         async with pool.acquire() as conn:
-            # Process station-based measurements
-            await execute_sql_file(
-                conn, SQL_DIR / "process_station_measurements.sql", {"date": date}
-            )
-
-            # Process PM2.5
-            await execute_sql_file(conn, SQL_DIR / "process_pm25.sql", {"date": date})
-
-            # Process PSI with sub-indexes
-            await execute_sql_file(conn, SQL_DIR / "process_psi.sql", {"date": date})
-
-            # Process national measurements (UV index)
-            await execute_sql_file(
-                conn, SQL_DIR / "process_uv_index.sql", {"date": date}
-            )
-
-            # Process 2 hour forecasts
-            await execute_sql_file(
-                conn, SQL_DIR / "process_two_hour_forecast.sql", {"date": date}
-            )
-
-            # Process 24 hour forecasts
-            await execute_sql_file(
-                conn, SQL_DIR / "process_twenty_four_hour_forecast.sql", {"date": date}
-            )
-
-            # Process 4 day forecasts
-            await execute_sql_file(
-                conn, SQL_DIR / "process_four_day_forecast.sql", {"date": date}
-            )
+            # Multi-statement scripts go over the simple query protocol, which
+            # takes no bind parameters, so the date is inlined as a typed literal
+            script = DATE_SQL_SCRIPT.format(date=f"'{date.isoformat()}'::date")
+            async with conn.transaction():
+                await conn.execute(script)
 
         await mark_date_status(pool, date, "completed")
         logger.info(f"Completed processing date: {date}")
@@ -158,6 +192,30 @@ async def transform_date_measurements(pool, date):
         return False
 
 
+async def count_table_rows(pool, table, start_date=None, end_date=None):
+    """Count a transformed table's rows within the optional date range."""
+    # Build dynamic query based on available date parameters
+    if start_date and end_date:
+        query = f"SELECT COUNT(*) FROM weather_transformed.{table} WHERE timestamp BETWEEN $1::date AND $2::date"
+        params = [start_date, end_date]
+    elif start_date:
+        query = f"SELECT COUNT(*) FROM weather_transformed.{table} WHERE timestamp >= $1::date"
+        params = [start_date]
+    elif end_date:
+        query = f"SELECT COUNT(*) FROM weather_transformed.{table} WHERE timestamp <= $1::date"
+        params = [end_date]
+    else:
+        query = f"SELECT COUNT(*) FROM weather_transformed.{table}"
+        params = []
+
+    try:
+        async with pool.acquire() as conn:
+            return await conn.fetchval(query, *params)
+    except Exception as e:
+        logger.warning(f"Error counting table {table}: {e}")
+        return 0
+
+
 async def transform_data(start_date=None, end_date=None, parallel=3):
     """Transform raw weather data into structured tables with date-based tracking"""
     logger.info("Starting data transformation process")
@@ -206,26 +264,48 @@ async def transform_data(start_date=None, end_date=None, parallel=3):
         # Generate date range
         processed_dates = 0
         skipped_dates = 0
+        failed_dates = []
         if start_date and end_date:
-            current_date = start_date
-            dates_to_process = []
-            while current_date <= end_date:
-                if await check_date_for_processing(pool, current_date):
-                    dates_to_process.append(current_date)
-                else:
-                    skipped_dates += 1
-                current_date += timedelta(days=1)
+            # The flow passes datetimes, but transform metadata is keyed by DATE
+            start_date, end_date = as_date(start_date), as_date(end_date)
+            completed_dates = await get_completed_dates(pool, start_date, end_date)
+            dates_to_process, skipped_dates = split_dates(
+                start_date, end_date, completed_dates
+            )
 
             logger.info(
                 f"Found {len(dates_to_process)} dates to process from {start_date} to {end_date}"
             )
 
-            # Process dates in parallel batches
-            for i in range(0, len(dates_to_process), parallel):
-                batch = dates_to_process[i : i + parallel]
-                tasks = [transform_date_measurements(pool, date) for date in batch]
-                results = await asyncio.gather(*tasks)
-                processed_dates = sum(1 for r in results if r)
+            if dates_to_process:
+                await mark_dates_started(pool, dates_to_process)
+
+            # Keep up to `parallel` dates in flight so one slow date does not stall
+            # the others
+            sem = asyncio.Semaphore(parallel)
+
+            async def worker(date):
+                async with sem:
+                    return await transform_date_measurements(pool, date)
+
+            # Retry failed dates with exponential backoff
+            pending = dates_to_process
+            for attempt in range(DATE_RETRIES + 1):
+                if attempt:
+                    delay = DATE_RETRY_DELAY * 2 ** (attempt - 1)
+                    logger.warning(
+                        f"Retrying {len(pending)} failed dates in {delay:.0f}s "
+                        f"(attempt {attempt + 1}/{DATE_RETRIES + 1})"
+                    )
+                    await asyncio.sleep(delay)
+                results = await asyncio.gather(*(worker(date) for date in pending))
+                processed_dates += sum(1 for r in results if r)
+                pending = [date for date, ok in zip(pending, results) if not ok]
+                if not pending:
+                    break
+            failed_dates = pending
+            if failed_dates:
+                logger.error(f"Dates that failed after retries: {failed_dates}")
 
         # Get final counts for transformed tasks
         tables_to_count = [
@@ -240,33 +320,17 @@ async def transform_data(start_date=None, end_date=None, parallel=3):
             "four_day_forecasts",
         ]
 
-        # Collect counts for all tables
-        async with pool.acquire() as conn:
-            for table in tables_to_count:
-                try:
-                    # Build dynamic query based on available date parameters
-                    if start_date and end_date:
-                        query = f"SELECT COUNT(*) FROM weather_transformed.{table} WHERE timestamp BETWEEN $1::date AND $2::date"
-                        params = [start_date, end_date]
-                    elif start_date:
-                        query = f"SELECT COUNT(*) FROM weather_transformed.{table} WHERE timestamp >= $1::date"
-                        params = [start_date]
-                    elif end_date:
-                        query = f"SELECT COUNT(*) FROM weather_transformed.{table} WHERE timestamp <= $1::date"
-                        params = [end_date]
-                    else:
-                        query = f"SELECT COUNT(*) FROM weather_transformed.{table}"
-                        params = []
-                        transform_stats[table] = await conn.fetchval(
-                            f"SELECT COUNT(*) FROM weather_transformed.{table} "
-                        )
-                    # Execute the appropriate query
-                    transform_stats[table] = await conn.fetchval(query, *params)
-                except Exception as e:
-                    logger.warning(f"Error counting table {table}: {e}")
-                    transform_stats[table] = 0
-            transform_stats["processed_dates"] = processed_dates
-            transform_stats["skipped_dates"] = skipped_dates
+        # Count all tables concurrently, each on its own pooled connection
+        counts = await asyncio.gather(
+            *(
+                count_table_rows(pool, table, start_date, end_date)
+                for table in tables_to_count
+            )
+        )
+        transform_stats.update(zip(tables_to_count, counts))
+        transform_stats["processed_dates"] = processed_dates
+        transform_stats["skipped_dates"] = skipped_dates
+        transform_stats["failed_dates"] = len(failed_dates)
 
         logger.info(f"Data transformation completed: {transform_stats}")
         return transform_stats
@@ -1,9 +1,11 @@
 from projects.sg_weather.src.schemas.weather import (  # type: ignore
     # Base Models
+    WeatherBaseModel,
     Location,
-    LabelLocation,
     Station,
     BaseResponse,
+    PaginatedData,
+    StationReading,
     TimestampedReading,
     TemperatureRange,
     WindSpeed,
@@ -13,31 +15,50 @@ from projects.sg_weather.src.schemas.weather import (  # type: ignore
     # Weather Data Models
     WeatherReadingData,
     AreaMetadata,
+    AreaForecast,
+    TwoHourForecastItem,
     TwoHourForecastData,
     FourDayOutlookForecast,
+    FourDayOutlookRecord,
     FourDayOutlookData,
     LightningData,
     PM25Data,
     PSIData,
+    UVIndexReading,
+    UVIndexRecord,
     UVIndexData,
     WBGTData,
-    # Response Models
-    WeatherResponse,
-    TwoHourForecastResponse,
-    FourDayOutlookResponse,
-    LightningResponse,
-    PM25Response,
-    PSIResponse,
-    UVIndexResponse,
-    WBGTResponse,
 )
 
+# Response models live in schemas.responses and are imported on first access
+_RESPONSE_MODELS = (
+    "WeatherResponse",
+    "TwoHourForecastResponse",
+    "FourDayOutlookResponse",
+    "LightningResponse",
+    "PM25Response",
+    "PSIResponse",
+    "UVIndexResponse",
+    "WBGTResponse",
+)
+
+
+def __getattr__(name):
+    if name in _RESPONSE_MODELS:
+        from projects.sg_weather.src.schemas import responses
+
+        return getattr(responses, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     # Base Models
+    "WeatherBaseModel",
     "Location",
-    "LabelLocation",
     "Station",
     "BaseResponse",
+    "PaginatedData",
+    "StationReading",
     "TimestampedReading",
     "TemperatureRange",
     "WindSpeed",
@@ -47,12 +68,17 @@ __all__ = [
     # Weather Data Models
     "WeatherReadingData",
     "AreaMetadata",
+    "AreaForecast",
+    "TwoHourForecastItem",
     "TwoHourForecastData",
     "FourDayOutlookForecast",
+    "FourDayOutlookRecord",
     "FourDayOutlookData",
     "LightningData",
     "PM25Data",
     "PSIData",
+    "UVIndexReading",
+    "UVIndexRecord",
     "UVIndexData",
     "WBGTData",
     # Response Models
@@ -0,0 +1,77 @@
+from projects.sg_weather.src.schemas.weather import (
+    BaseResponse,
+    WeatherReadingData,
+    TwoHourForecastData,
+    TwentyFourHourOutlookData,
+    FourDayOutlookData,
+    LightningData,
+    PM25Data,
+    PSIData,
+    UVIndexData,
+    WBGTData,
+)
+
+
+# Response Models for each API endpoint
+# Kept apart from the data models, which are all the ingestion code validates
+# into, so importing those does not also define the wrappers
+class WeatherResponse(BaseResponse):
+    data: WeatherReadingData
+
+
+class TwoHourForecastResponse(BaseResponse):
+    data: TwoHourForecastData
+
+
+class TwentyFourHourOutlookResponse(BaseResponse):
+    data: TwentyFourHourOutlookData
+
+
+class FourDayOutlookResponse(BaseResponse):
+    data: FourDayOutlookData
+
+
+class LightningResponse(BaseResponse):
+    data: LightningData
+
+
+class PM25Response(BaseResponse):
+    data: PM25Data
+
+
+class PSIResponse(BaseResponse):
+    data: PSIData
+
+
+class UVIndexResponse(BaseResponse):
+    data: UVIndexData
+
+
+class WBGTResponse(BaseResponse):
+    data: WBGTData
+
+
+# Example usage:
+"""
+# Temperature reading
+response = WeatherResponse(
+    code=0,
+    error_msg=None,
+    data={
+        "stations": [...],
+        "readings": [...],
+        "reading_type": "DBT 1M F",
+        "reading_unit": "deg C"
+    }
+)
+
+# Two-hour forecast
+forecast = TwoHourForecastResponse(
+    code=0,
+    error_msg=None,
+    data={
+        "area_metadata": [...],
+        "items": [...]
+    }
+)
+"""
@@ -1,84 +1,125 @@
-from datetime import datetime
-from typing import List, Optional, Dict, Union
+from datetime import date, datetime
+from typing import Annotated, List, Optional, Dict
 from pydantic import BaseModel, Field, ConfigDict
+from pydantic.dataclasses import dataclass
 
 
 # Common Base Models
-class Location(BaseModel):
-    latitude: float
-    longitude: float
+# Leaf value types are slotted, frozen pydantic dataclasses: no per-instance
+# __dict__, and they validate and serialize like the models that contain them.
+# slots=True needs Python 3.10+, hence requires-python in pyproject.toml
+class WeatherBaseModel(BaseModel):
+    """Shared config: validators are built on first use and instances are immutable."""
+
+    model_config = ConfigDict(
+        defer_build=True, populate_by_name=True, extra="ignore", frozen=True
+    )
 
 
-class LabelLocation(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Location:
     latitude: float
     longitude: float
 
 
-class Station(BaseModel):
+@dataclass(frozen=True, slots=True, config=ConfigDict(populate_by_name=True))
+class Station:
     id: str
-    device_id: str = Field(alias="deviceId")
+    # Annotated keeps the alias from counting as a dataclass default
+    device_id: Annotated[str, Field(alias="deviceId")]
     name: str
-    location: LabelLocation
+    location: Location
+
+
+class PaginatedData(WeatherBaseModel):
+    """Fields shared by every endpoint's data payload."""
+
+    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
 
 
-class BaseResponse(BaseModel):
+class BaseResponse(WeatherBaseModel):
     code: int
     error_msg: Optional[str] = Field(default=None, alias="errorMsg")
 
 
-class TimestampedReading(BaseModel):
-    timestamp: str
-    data: List[Dict]
+@dataclass(frozen=True, slots=True)
+class StationReading:
+    # Keeps the raw key name: process_station_measurements.sql reads stationId
+    # from the stored JSON
+    stationId: str
+    value: float
+
+
+class TimestampedReading(WeatherBaseModel):
+    timestamp: datetime
+    data: List[StationReading]
 
 
-class TemperatureRange(BaseModel):
+@dataclass(frozen=True, slots=True)
+class TemperatureRange:
     low: float
     high: float
     unit: str
 
 
-class WindSpeed(BaseModel):
+@dataclass(frozen=True, slots=True)
+class WindSpeed:
     low: float
     high: float
 
 
-class Wind(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Wind:
     speed: WindSpeed
     direction: str
 
 
-class ValidPeriod(BaseModel):
-    start: str
-    end: str
+@dataclass(frozen=True, slots=True)
+class ValidPeriod:
+    start: datetime
+    end: datetime
     text: str
 
 
-class WeatherForecast(BaseModel):
-    code: Optional[str] = None
+@dataclass(frozen=True, slots=True)
+class WeatherForecast:
     text: str
+    code: Optional[str] = None
 
 
 # Specific Weather Data Models
-class WeatherReadingData(BaseModel):
+class WeatherReadingData(PaginatedData):
     stations: List[Station]
     readings: List[TimestampedReading]
     reading_type: str = Field(alias="readingType")
     reading_unit: str = Field(alias="readingUnit")
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
 
 
-class AreaMetadata(BaseModel):
+@dataclass(frozen=True, slots=True, config=ConfigDict(populate_by_name=True))
+class AreaMetadata:
     name: str
     location: Location = Field(alias="label_location")
 
 
-class TwoHourForecastData(BaseModel):
+@dataclass(frozen=True, slots=True)
+class AreaForecast:
+    area: str
+    forecast: str
+
+
+class TwoHourForecastItem(WeatherBaseModel):
+    update_timestamp: Optional[datetime] = None
+    timestamp: datetime
+    valid_period: ValidPeriod
+    forecasts: List[AreaForecast]
+
+
+class TwoHourForecastData(PaginatedData):
     area_metadata: List[AreaMetadata] = Field(alias="area_metadata")
-    items: List[Dict]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
+    items: List[TwoHourForecastItem]
 
 
-class TwentyFourHourOutlookGeneral(BaseModel):
+class TwentyFourHourOutlookGeneral(WeatherBaseModel):
     temperature: TemperatureRange
     relative_humidity: TemperatureRange = Field(alias="relativeHumidity")
     forecast: WeatherForecast
@@ -86,7 +127,7 @@ class TwentyFourHourOutlookGeneral(BaseModel):
     wind: Wind
 
 
-class Regions(BaseModel):
+class Regions(WeatherBaseModel):
     west: WeatherForecast
     east: WeatherForecast
     central: WeatherForecast
@@ -94,26 +135,25 @@ class Regions(BaseModel):
     north: WeatherForecast
 
 
-class TwentyFourHourOutlookPeriod(BaseModel):
+class TwentyFourHourOutlookPeriod(WeatherBaseModel):
     time_period: ValidPeriod = Field(alias="timePeriod")
     regions: Regions
 
 
-class TwentyFourHourOutlookRecord(BaseModel):
-    timestamp: str
-    date: str
-    updated_timestamp: str = Field(alias="updatedTimestamp")
+class TwentyFourHourOutlookRecord(WeatherBaseModel):
+    timestamp: datetime
+    date: date
+    updated_timestamp: datetime = Field(alias="updatedTimestamp")
     general: TwentyFourHourOutlookGeneral
     periods: List[TwentyFourHourOutlookPeriod]
 
 
-class TwentyFourHourOutlookData(BaseModel):
+class TwentyFourHourOutlookData(PaginatedData):
     records: List[TwentyFourHourOutlookRecord]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
 
 
-class FourDayOutlookForecast(BaseModel):
-    timestamp: str
+class FourDayOutlookForecast(WeatherBaseModel):
+    timestamp: datetime
     temperature: TemperatureRange
     relative_humidity: TemperatureRange = Field(alias="relativeHumidity")
     wind: Wind
@@ -121,22 +161,29 @@ class FourDayOutlookForecast(BaseModel):
     day: str
 
 
-class FourDayOutlookData(BaseModel):
-    records: List[Dict[str, Union[str, datetime, List[FourDayOutlookForecast]]]]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
+class FourDayOutlookRecord(WeatherBaseModel):
+    date: date
+    updated_timestamp: datetime = Field(alias="updatedTimestamp")
+    timestamp: datetime
+    forecasts: List[FourDayOutlookForecast]
+
+
+class FourDayOutlookData(PaginatedData):
+    records: List[FourDayOutlookRecord]
 
 
-class LightningData(BaseModel):
+class LightningData(PaginatedData):
     records: List[Dict]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
 
 
-class RegionMetadata(BaseModel):
+@dataclass(frozen=True, slots=True, config=ConfigDict(populate_by_name=True))
+class RegionMetadata:
     name: str
     location: Location = Field(alias="labelLocation")
 
 
-class PollutionRegions(BaseModel):
+@dataclass(frozen=True, slots=True)
+class PollutionRegions:
     west: float
     east: float
     central: float
@@ -144,26 +191,25 @@ class PollutionRegions(BaseModel):
     north: float
 
 
-class PM25Readings(BaseModel):
+class PM25Readings(WeatherBaseModel):
     pm25_one_hourly: PollutionRegions
 
 
-class PM25Item(BaseModel):
-    date: str
-    updated_timestamp: str = Field(alias="updatedTimestamp")
-    timestamp: str
+class PM25Item(WeatherBaseModel):
+    date: date
+    updated_timestamp: datetime = Field(alias="updatedTimestamp")
+    timestamp: datetime
     readings: PM25Readings
 
 
-class PM25Data(BaseModel):
+class PM25Data(PaginatedData):
     region_metadata: List[RegionMetadata] = Field(alias="regionMetadata")
     items: List[PM25Item]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
 
     # psi_three_hourly: PollutionRegions
 
 
-class PSIReadings(BaseModel):
+class PSIReadings(WeatherBaseModel):
     co_sub_index: PollutionRegions
     so2_twenty_four_hourly: PollutionRegions
     so2_sub_index: PollutionRegions
@@ -178,87 +224,34 @@ class PSIReadings(BaseModel):
     pm10_twenty_four_hourly: PollutionRegions
 
 
-class PSIItem(BaseModel):
-    date: str
-    updated_timestamp: str = Field(alias="updatedTimestamp")
-    timestamp: str
+class PSIItem(WeatherBaseModel):
+    date: date
+    updated_timestamp: datetime = Field(alias="updatedTimestamp")
+    timestamp: datetime
     readings: PSIReadings
 
 
-class PSIData(BaseModel):
+class PSIData(PaginatedData):
     region_metadata: List[RegionMetadata] = Field(alias="regionMetadata")
     items: List[PSIItem]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
-
-
-class UVIndexData(BaseModel):
-    records: List[Dict]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
-
-
-class WBGTData(BaseModel):
-    records: List[Dict]
-    pagination_token: Optional[str] = Field(default=None, alias="paginationToken")
-
-
-# Response Models for each API endpoint
-class WeatherResponse(BaseResponse):
-    data: WeatherReadingData
-
 
-class TwoHourForecastResponse(BaseResponse):
-    data: TwoHourForecastData
 
+@dataclass(frozen=True, slots=True)
+class UVIndexReading:
+    hour: datetime
+    value: float
 
-class TwentyFourHourOutlookResponse(BaseResponse):
-    data: TwentyFourHourOutlookData
 
+class UVIndexRecord(WeatherBaseModel):
+    date: date
+    updated_timestamp: datetime = Field(alias="updatedTimestamp")
+    timestamp: datetime
+    index: List[UVIndexReading]
 
-class FourDayOutlookResponse(BaseResponse):
-    data: FourDayOutlookData
 
+class UVIndexData(PaginatedData):
+    records: List[UVIndexRecord]
 
-class LightningResponse(BaseResponse):
-    data: LightningData
 
-
-class PM25Response(BaseResponse):
-    data: PM25Data
-
-
-class PSIResponse(BaseResponse):
-    data: PSIData
-
-
-class UVIndexResponse(BaseResponse):
-    data: UVIndexData
-
-
-class WBGTResponse(BaseResponse):
-    data: WBGTData
-
-
-# Example usage:
-"""
-# Temperature reading
-response = WeatherResponse(
-    code=0,
-    error_msg=None,
-    data={
-        "stations": [...],
-        "readings": [...],
-        "reading_type": "DBT 1M F",
-        "reading_unit": "deg C"
-    }
-)
-
-# Two-hour forecast
-forecast = TwoHourForecastResponse(
-    code=0,
-    error_msg=None,
-    data={
-        "area_metadata": [...],
-        "items": [...]
-    }
-)
-"""
+class WBGTData(PaginatedData):
+    records: List[Dict]
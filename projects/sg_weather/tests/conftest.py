@@ -0,0 +1,99 @@
+"""
+Shared test fixtures.
+Database tests run against the database in SG_WEATHER_TEST_DATABASE_URL and are
+skipped when it is not set; its weather tables are truncated by every test.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import asyncpg
+import pytest
+import pytest_asyncio
+
+from projects.sg_weather.src.ingestion.storage import WeatherDataFile, WeatherStorage
+from projects.sg_weather.src.schemas.weather import UVIndexData
+
+TEST_DSN = os.environ.get("SG_WEATHER_TEST_DATABASE_URL")
+
+# Same tables as WeatherStorage.initialize_tables, without the TimescaleDB
+# hypertable so any PostgreSQL server will do
+RAW_TABLES_DDL = """
+    CREATE TABLE IF NOT EXISTS raw_weather_data (
+        data_timestamp TIMESTAMPTZ NOT NULL,
+        data_type TEXT NOT NULL,
+        parameter TEXT NOT NULL,
+        validated_data JSONB NOT NULL,
+        ingestion_timestamp TIMESTAMPTZ DEFAULT NOW(),
+        PRIMARY KEY (data_timestamp, data_type, parameter)
+    );
+    CREATE TABLE IF NOT EXISTS weather_data_metadata (
+        data_timestamp TIMESTAMPTZ NOT NULL,
+        data_type TEXT NOT NULL,
+        parameter TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        file_hash TEXT NOT NULL,
+        load_timestamp TIMESTAMPTZ DEFAULT NOW(),
+        PRIMARY KEY (data_timestamp, data_type, parameter)
+    );
+"""
+
+
+@pytest_asyncio.fixture
+async def db_pool():
+    if not TEST_DSN:
+        pytest.skip("SG_WEATHER_TEST_DATABASE_URL is not set")
+    pool = await asyncpg.create_pool(TEST_DSN, min_size=1, max_size=4)
+    async with pool.acquire() as conn:
+        await conn.execute(RAW_TABLES_DDL)
+        await conn.execute("TRUNCATE raw_weather_data, weather_data_metadata")
+    yield pool
+    await pool.close()
+
+
+@pytest_asyncio.fixture
+async def storage(db_pool):
+    store = WeatherStorage(TEST_DSN)
+    # Share the fixture pool; connect() would also try to enable TimescaleDB
+    store._pool = db_pool
+    await store._initialize_metadata_cache()
+    yield store
+    store._pool = None
+
+
+def _make_file(
+    index: int,
+    parameter: str = "uv-index",
+    file_hash: str = "hash",
+    timestamp: Optional[datetime] = None,
+) -> WeatherDataFile:
+    """A prepared file whose key is unique per (index, parameter)."""
+    # Aware, like the keys WeatherStorage builds from file names
+    timestamp = timestamp or datetime(2024, 1, 1).astimezone()
+    return WeatherDataFile(
+        timestamp=timestamp + timedelta(hours=index),
+        data_type="reading",
+        parameter=parameter,
+        model_data=UVIndexData(records=[]),
+        file_path=Path(f"{parameter}/{index}.json"),
+        file_hash=file_hash,
+        validated_json=f'{{"index": {index}, "hash": "{file_hash}"}}',
+    )
+
+
+@pytest.fixture
+def make_file():
+    return _make_file
+
+
+@pytest.fixture
+def singapore_tz(monkeypatch):
+    """Run the test with the host clock in Singapore time (UTC+08:00)."""
+    monkeypatch.setenv("TZ", "Asia/Singapore")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
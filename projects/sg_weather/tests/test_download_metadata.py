@@ -0,0 +1,45 @@
+import orjson
+import pytest
+
+from projects.sg_weather.src.ingestion.downloader import DownloadMetadata
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_legacy_json_metadata_is_imported(tmp_path):
+    metadata_file = tmp_path / "download_metadata.db"
+    legacy_file = metadata_file.with_suffix(".json")
+    legacy_file.write_bytes(
+        orjson.dumps({"temperature": {"20240101": "2024-01-02T00:00:00"}})
+    )
+
+    async with DownloadMetadata(metadata_file) as metadata:
+        assert metadata.is_downloaded("temperature", "20240101")
+        assert not metadata.is_downloaded("temperature", "20240102")
+    assert not legacy_file.exists()
+
+
+async def test_legacy_json_metadata_is_merged_into_existing_database(tmp_path):
+    metadata_file = tmp_path / "download_metadata.db"
+    async with DownloadMetadata(metadata_file) as metadata:
+        metadata.mark_downloaded("pm25", "20240101")
+
+    # Written by an older version after the database was created
+    metadata_file.with_suffix(".json").write_bytes(
+        orjson.dumps({"psi": {"20240101": "2024-01-02T00:00:00"}})
+    )
+
+    async with DownloadMetadata(metadata_file) as metadata:
+        assert metadata.is_downloaded("pm25", "20240101")
+        assert metadata.is_downloaded("psi", "20240101")
+
+
+async def test_marks_are_flushed_on_close(tmp_path):
+    metadata_file = tmp_path / "download_metadata.db"
+
+    async with DownloadMetadata(metadata_file, flush_threshold=10) as metadata:
+        metadata.mark_downloaded("pm25", "20240101")
+        assert not metadata.needs_flush
+
+    async with DownloadMetadata(metadata_file) as metadata:
+        assert metadata.is_downloaded("pm25", "20240101")
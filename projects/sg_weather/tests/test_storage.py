@@ -0,0 +1,99 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from projects.sg_weather.src.ingestion.storage import (
+    COPY_MIN_RECORDS,
+    MetadataKey,
+    WeatherStorage,
+)
+from projects.sg_weather.src.schemas.weather import UVIndexData
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_concurrent_copy_batches_stay_separate(storage, db_pool, make_file):
+    # Both batches take the COPY path on their own connections at once
+    temperature = [make_file(i, "temperature") for i in range(COPY_MIN_RECORDS)]
+    pm25 = [make_file(i, "pm25") for i in range(COPY_MIN_RECORDS)]
+
+    results = await asyncio.gather(
+        storage.process_batch(temperature), storage.process_batch(pm25)
+    )
+
+    assert [r.failed for r in results] == [[], []]
+    async with db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            "SELECT parameter, COUNT(*) AS n FROM raw_weather_data GROUP BY 1"
+        )
+        metadata_rows = await conn.fetchval(
+            "SELECT COUNT(*) FROM weather_data_metadata"
+        )
+    assert {row["parameter"]: row["n"] for row in rows} == {
+        "temperature": COPY_MIN_RECORDS,
+        "pm25": COPY_MIN_RECORDS,
+    }
+    assert metadata_rows == 2 * COPY_MIN_RECORDS
+
+
+async def test_copy_batch_can_be_staged_again(storage, db_pool, make_file):
+    files = [make_file(i) for i in range(COPY_MIN_RECORDS)]
+    await storage.process_batch(files)
+
+    changed = [make_file(i, file_hash="changed") for i in range(COPY_MIN_RECORDS)]
+    result = await storage.process_batch(changed)
+
+    assert not result.failed
+    async with db_pool.acquire() as conn:
+        hashes = await conn.fetch(
+            "SELECT DISTINCT file_hash FROM weather_data_metadata"
+        )
+    assert [row["file_hash"] for row in hashes] == ["changed"]
+
+
+async def test_metadata_cache_keys_match_file_names(storage, singapore_tz, make_file):
+    file_path = Path("20240101_uv-index.json")
+    timestamp = storage._extract_timestamp(file_path)
+    await storage.process_batch([make_file(0, timestamp=timestamp)])
+
+    # A fresh instance loads its keys from the database
+    reloaded = WeatherStorage(storage.dsn)
+    reloaded._pool = storage._pool
+    await reloaded._initialize_metadata_cache()
+
+    processed, _ = await reloaded.is_file_already_processed(
+        timestamp, "reading", "uv-index", file_path, "hash"
+    )
+    assert processed
+    assert MetadataKey(timestamp, "reading", "uv-index") in reloaded._metadata_cache
+
+
+async def test_changed_file_is_written_when_cache_is_stale(storage, db_pool, make_file):
+    # Another loader stores the key after this instance loaded its cache
+    other = WeatherStorage(storage.dsn)
+    other._pool = storage._pool
+    other._cache_initialized = True
+    await other.process_batch([make_file(0, file_hash="old")])
+
+    result = await storage.process_batch([make_file(0, file_hash="new")])
+
+    assert not result.failed
+    async with db_pool.acquire() as conn:
+        file_hash = await conn.fetchval("SELECT file_hash FROM weather_data_metadata")
+        data = await conn.fetchval("SELECT validated_data FROM raw_weather_data")
+    assert file_hash == "new"
+    assert json.loads(data)["hash"] == "new"
+
+
+async def test_store_data_updates_metadata_cache(storage, tmp_path):
+    file_path = tmp_path / "20240101_uv-index.json"
+    file_path.write_text('{"records": []}')
+
+    await storage.store_data("reading", "uv-index", UVIndexData(records=[]), file_path)
+
+    processed, _ = await storage.is_file_already_processed(
+        storage._extract_timestamp(file_path), "reading", "uv-index", file_path
+    )
+    assert processed
@@ -0,0 +1,57 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from projects.sg_weather.src.processing.transform import (
+    create_transform_metadata_table,
+    get_completed_dates,
+    mark_dates_started,
+    split_dates,
+)
+
+
+def test_split_dates_skips_completed_dates_given_datetimes():
+    completed = {date(2024, 1, 2)}
+
+    dates, skipped = split_dates(datetime(2024, 1, 1), datetime(2024, 1, 3), completed)
+
+    assert dates == [date(2024, 1, 1), date(2024, 1, 3)]
+    assert skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_datetime_range_skips_completed_and_keeps_parameters(db_pool):
+    async with db_pool.acquire() as conn:
+        await conn.execute("CREATE SCHEMA IF NOT EXISTS weather_transformed")
+    await create_transform_metadata_table(db_pool)
+    async with db_pool.acquire() as conn:
+        await conn.execute("TRUNCATE weather_transformed.transform_metadata")
+        await conn.execute(
+            """
+            INSERT INTO weather_transformed.transform_metadata
+            (date, parameters, started_at, completed_at, status)
+            VALUES ('2024-01-02', '[]', NOW(), NOW(), 'completed')
+            """
+        )
+        await conn.execute(
+            """
+            INSERT INTO raw_weather_data
+            (data_timestamp, data_type, parameter, validated_data)
+            VALUES ('2024-01-03 06:00+00', 'reading', 'pm25', '{}')
+            """
+        )
+
+    start, end = datetime(2024, 1, 1), datetime(2024, 1, 3)
+    completed = await get_completed_dates(db_pool, start.date(), end.date())
+    dates, skipped = split_dates(start, end, completed)
+    await mark_dates_started(db_pool, dates)
+
+    assert dates == [date(2024, 1, 1), date(2024, 1, 3)]
+    assert skipped == 1
+    async with db_pool.acquire() as conn:
+        parameters = await conn.fetchval(
+            "SELECT parameters FROM weather_transformed.transform_metadata "
+            "WHERE date = '2024-01-03'"
+        )
+    assert json.loads(parameters) == ["pm25"]
@@ -0,0 +1,11 @@
+"""Switch asyncio over to uvloop when it is available."""
+
+import asyncio
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
+if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
@@ -0,0 +1,29 @@
+"""Helpers for waiting on locally started servers."""
+
+import asyncio
+import subprocess
+
+
+async def wait_port(
+    host: str,
+    port: int,
+    process: subprocess.Popen,
+    timeout: float = 15.0,
+    interval: float = 0.1,
+) -> bool:
+    """Wait until host:port accepts TCP connections or the process exits."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        if process.poll() is not None:  # Process exited early
+            return False
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), timeout=interval
+            )
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except (OSError, asyncio.TimeoutError):
+            await asyncio.sleep(interval)
+    return False